@@ -1,21 +1,113 @@
-import math
+import asyncio
+import hmac
+import logging
 import os
 import re
-import traceback
-from io import StringIO
+import threading
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from functools import lru_cache
+from io import BytesIO
 from urllib.parse import quote
+from zoneinfo import ZoneInfo
 
+import httpx
+import lxml.html
+from lxml import etree
+import numpy as np
+import orjson
 import pandas as pd
-import requests
-import yfinance as yf
-from fastapi import FastAPI, HTTPException, Request
+from cachetools import TTLCache, cached
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from utils import calculate_indicators, generate_signal, generate_dual_signal
 
-app = FastAPI(title="LKBUY2 API")
+# 기본 INFO: 요청별 debug 로그는 LOG_LEVEL=DEBUG 일 때만 포맷/출력된다
+logger = logging.getLogger("lkbuy2")
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# Accept-Encoding 은 httpx 가 설치된 디코더 기준으로 붙인다 (gzip, deflate, brotli 설치 시 br)
+NAVER_HEADERS = {
+    "User-Agent": "Mozilla/5.0",
+    "Referer": "https://finance.naver.com/",
+}
+FINNHUB_BASE_URL = "https://finnhub.io/api/v1"
+FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY", "").strip()
+# /cache/clear 호출용 토큰, 비어 있으면 라우트를 막는다
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "").strip()
+
+# 일봉은 하루 한 번 확정되므로 짧은 TTL 로 원천 조회/지표 계산을 건너뛴다
+MARKET_TZ = ZoneInfo("Asia/Seoul")
+STOCK_CACHE = TTLCache(maxsize=2048, ttl=300)
+RESPONSE_CACHE = TTLCache(maxsize=4096, ttl=300)
+YAHOO_CACHE = TTLCache(maxsize=512, ttl=300)
+YAHOO_CACHE_LOCK = threading.Lock()
+# 검색어 -> 종목코드 매핑은 거의 바뀌지 않으므로 하루 동안 재사용
+SEARCH_CACHE = TTLCache(maxsize=4096, ttl=24 * 3600)
+INDICATOR_CACHE = TTLCache(maxsize=2048, ttl=300)
+
+# 휴장 구간이 길어도 마지막 5거래일 VIX 가 확보되는 범위
+VIX_LOOKBACK_DAYS = 60
+
+# 호스트별 클라이언트: 커넥션(TCP/TLS) 재사용, 풀 슬롯이 서로 경쟁하지 않도록 분리
+NAVER_CLIENT: httpx.AsyncClient | None = None
+FINNHUB_CLIENT: httpx.AsyncClient | None = None
+FRED_CLIENT: httpx.AsyncClient | None = None
+
+
+# 연결 3초 제한: 응답 없는 호스트 하나가 요청 전체를 붙잡지 않도록
+HTTP_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+
+
+def build_client(headers: dict | None = None) -> httpx.AsyncClient:
+    # transport 를 직접 넘기면 클라이언트의 limits/http2 인자는 무시되므로 transport 에 지정
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=HTTP_TIMEOUT,
+        transport=httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=2,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+        ),
+    )
+
+
+def configure_logging() -> None:
+    # uvicorn 은 자체 로거만 설정하므로 앱 로거 핸들러는 기동 시 한 번만 붙인다
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(handler)
+    logger.propagate = False
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global NAVER_CLIENT, FINNHUB_CLIENT, FRED_CLIENT
+    configure_logging()
+    NAVER_CLIENT = build_client(NAVER_HEADERS)
+    # API 키는 쿼리 대신 헤더로 보내 예외 메시지/로그의 URL 에 남지 않게 한다
+    FINNHUB_CLIENT = build_client({"X-Finnhub-Token": FINNHUB_API_KEY})
+    FRED_CLIENT = build_client()
+    try:
+        yield
+    finally:
+        await asyncio.gather(NAVER_CLIENT.aclose(), FINNHUB_CLIENT.aclose(), FRED_CLIENT.aclose())
+
+
+class ORJSONResponse(JSONResponse):
+    # orjson: C 직렬화, UTF-8 바이트 직접 생성, NaN/inf 는 null 로 내보냄
+    media_type = "application/json; charset=utf-8"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+app = FastAPI(title="LKBUY2 API", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,21 +117,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-NAVER_HEADERS = {
-    "User-Agent": "Mozilla/5.0",
-    "Referer": "https://finance.naver.com/",
-}
-FINNHUB_BASE_URL = "https://finnhub.io/api/v1"
-FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY", "").strip()
+# 잘못된 decision 은 기존처럼 400 + 한글 메시지로 응답하기 위해 Literal 대신 핸들러에서 검사
+DECISIONS = frozenset(("매수", "매도"))
 
 
 class AnalysisRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, str_max_length=64)
+
     symbol: str
     decision: str | None = None
 
 
-def safe_float(value):
-    return float(value) if value is not None and math.isfinite(value) else 0.0
+# 배치 요청 한 번에 처리하는 최대 종목 수
+BATCH_MAX_SYMBOLS = 50
+# 배치에서 동시에 시세를 받는 종목 수: 종목당 네이버 페이지 요청이 여러 개라 커넥션 풀을 넘기지 않도록 제한
+BATCH_FETCH_LIMIT = asyncio.Semaphore(8)
+
+
+class BatchRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, str_max_length=64)
+
+    symbols: list[str]
+    decision: str | None = None
+
+
+def safe_floats(values: dict, keys) -> dict:
+    # 값 여러 개의 None/NaN/inf -> 0.0 정리를 배열 연산 한 번으로 처리
+    arr = np.array([values.get(k) for k in keys], dtype=np.float64)
+    arr[~np.isfinite(arr)] = 0.0
+    return dict(zip(keys, arr.tolist()))
+
+
+# 요청마다 쓰는 패턴은 모듈 로드 시 한 번만 컴파일
+SYMBOL_STRIP_RE = re.compile(r"[^A-Z0-9\.\-:_]")
+SEARCH_STRIP_RE = re.compile(r"[^0-9A-Za-z가-힣\s\-\._\(\):+]")
+WHITESPACE_RE = re.compile(r"\s+")
+NON_WORD_RE = re.compile(r"[^0-9A-Za-z가-힣]")
+DIGIT_RE = re.compile(r"\d")
+ALPHA_RE = re.compile(r"[A-Za-z]")
+SPECIAL_RE = re.compile(r"[^0-9A-Za-z가-힣\s]")
+KRX_CODE_RE = re.compile(r"[0-9A-Z]{6,12}")
+CODE_PARAM_RE = re.compile(r"code=([0-9A-Z]{6,12})")
+SIX_DIGIT_RE = re.compile(r"(?<!\d)(\d{6})(?!\d)")
+MOBILE_STOCK_CODE_RE = re.compile(r'"stockCode"\s*:\s*"([0-9A-Z]{6,12})"')
+MOBILE_STOCK_PATH_RE = re.compile(r"/stock/([0-9A-Z]{6,12})")
 
 
 def normalize_symbol(symbol: str) -> str:
@@ -48,7 +169,7 @@ def normalize_symbol(symbol: str) -> str:
 
     s = str(symbol).strip().upper()
     # 해외/국내 혼합 입력용: 영문/숫자/.-:_ 만 유지
-    s = re.sub(r"[^A-Z0-9\.\-:_]", "", s)
+    s = SYMBOL_STRIP_RE.sub("", s)
     return s
 
 
@@ -58,14 +179,16 @@ def normalize_search_query(symbol: str) -> str:
 
     s = str(symbol).strip()
     # 네이버 검색용: 한글, 영문, 숫자, 공백, 괄호, .-_:+ 허용
-    s = re.sub(r"[^0-9A-Za-z가-힣\s\-\._\(\):+]", "", s)
-    s = re.sub(r"\s+", " ", s).strip()
+    s = SEARCH_STRIP_RE.sub("", s)
+    s = WHITESPACE_RE.sub(" ", s).strip()
     return s
 
 
-def is_krx_symbol(symbol: str) -> bool:
-    s = str(symbol).strip().upper()
-    return re.fullmatch(r"[0-9A-Z]{6,12}", s) is not None
+# 국내 ETF/ETN 브랜드 검색어: 호출마다 리스트를 새로 만들지 않도록 모듈 상수로 둔다
+DOMESTIC_KEYWORDS = (
+    "ETF", "ETN", "KODEX", "TIGER", "ACE", "KBSTAR", "ARIRANG", "KOSEF", "SOL", "HANARO", "TIMEFOLIO", "PLUS", "RISE",
+)
+
 
 def is_possible_domestic_query(symbol: str) -> bool:
     if symbol is None:
@@ -80,21 +203,17 @@ def is_possible_domestic_query(symbol: str) -> bool:
         return True
 
     # 숫자/영문/특수문자가 섞인 6문자 이상 입력도 국내 검색 후보로 허용
-    compact = re.sub(r"[^0-9A-Za-z가-힣]", "", raw)
-    has_digit = bool(re.search(r"\d", raw))
-    has_alpha = bool(re.search(r"[A-Za-z]", raw))
-    has_special = bool(re.search(r"[^0-9A-Za-z가-힣\s]", raw))
+    compact = NON_WORD_RE.sub("", raw)
+    has_digit = DIGIT_RE.search(raw) is not None
+    has_alpha = ALPHA_RE.search(raw) is not None
+    has_special = SPECIAL_RE.search(raw) is not None
 
     if len(compact) >= 6 and (has_alpha or has_special) and has_digit:
         return True
 
     # 국내 ETF/ETN 계열 검색어도 허용
     upper = raw.upper()
-    keywords = ["ETF", "ETN", "KODEX", "TIGER", "ACE", "KBSTAR", "ARIRANG", "KOSEF", "SOL", "HANARO", "TIMEFOLIO", "PLUS", "RISE"]
-    if any(k in upper for k in keywords):
-        return True
-
-    return False
+    return any(k in upper for k in DOMESTIC_KEYWORDS)
 
 
 
@@ -105,186 +224,150 @@ def extract_krx_code(symbol: str) -> str | None:
     raw = str(symbol).strip().upper()
 
     # 1) 영문+숫자 혼합 6~12자리 코드 자체
-    exact_alnum = re.fullmatch(r"[0-9A-Z]{6,12}", raw)
+    exact_alnum = KRX_CODE_RE.fullmatch(raw)
     if exact_alnum:
         return raw
 
     # 2) code=XXXXX 형태에서 영문 포함 코드 추출
-    m = re.search(r"code=([0-9A-Z]{6,12})", raw)
+    m = CODE_PARAM_RE.search(raw)
     if m:
         return m.group(1)
 
     # 3) 숫자 6자리 코드
-    exact_num = re.search(r"(?<!\d)(\d{6})(?!\d)", raw)
+    exact_num = SIX_DIGIT_RE.search(raw)
     if exact_num:
         return exact_num.group(1)
 
     return None
 
 
-KRX_CONFUSABLE_CHAR_MAP = {
-    "O": "0",
-    "Q": "0",
-    "D": "0",
-    "I": "1",
-    "L": "1",
-    "Z": "2",
-    "S": "5",
-    "B": "8",
-    "G": "6",
-}
-
-
-def extract_krx_candidates(symbol: str) -> list[str]:
-    """
-    국내 종목코드 후보를 넓게 생성.
-    예:
-    - 005930.KS -> 005930
-    - KRX:005930 -> 005930
-    - 0026E0 -> 002660 처럼 혼동 문자 보정 후보 생성
-    """
-    if symbol is None:
-        return []
-
-    raw = str(symbol).strip().upper()
-    candidates: list[str] = []
-    seen: set[str] = set()
-
-    def add(candidate: str | None):
-        if candidate and re.fullmatch(r"\d{6}", candidate) and candidate not in seen:
-            seen.add(candidate)
-            candidates.append(candidate)
-
-    # 1) 기존 규칙 기반 직접 추출
-    add(extract_krx_code(raw))
-
-    # 2) 숫자만 남겼을 때 5~6자리면 0패딩도 고려
-    digits_only = re.sub(r"[^0-9]", "", raw)
-    if len(digits_only) == 6:
-        add(digits_only)
-    elif len(digits_only) == 5:
-        add(digits_only.zfill(6))
-
-    # 3) 영문 혼합형에 대해 혼동문자 치환 후 숫자화
-    translated_chars = []
-    for ch in raw:
-        if ch.isdigit():
-            translated_chars.append(ch)
-        elif ch in KRX_CONFUSABLE_CHAR_MAP:
-            translated_chars.append(KRX_CONFUSABLE_CHAR_MAP[ch])
-    translated_digits = "".join(translated_chars)
-
-    if len(translated_digits) == 6:
-        add(translated_digits)
-    elif len(translated_digits) > 6:
-        for i in range(len(translated_digits) - 5):
-            add(translated_digits[i:i+6])
-    elif len(translated_digits) == 5:
-        add(translated_digits.zfill(6))
-
-    # 4) 원문에서 6글자 블록 단위로 잘라 보고 혼동문자 치환
-    compact = re.sub(r"[^A-Z0-9]", "", raw)
-    if len(compact) >= 6:
-        for i in range(len(compact) - 5):
-            block = compact[i:i+6]
-            converted = "".join(ch if ch.isdigit() else KRX_CONFUSABLE_CHAR_MAP.get(ch, "") for ch in block)
-            add(converted if len(converted) == 6 else None)
-
-    return candidates
-
-
-def search_krx_code_from_naver(query: str) -> str | None:
+async def search_krx_code_from_naver(query: str) -> str | None:
     """
     국내 ETF/ETN/레버리지/종목명을 네이버 금융 검색으로 6자리 종목코드로 해석.
     입력이 영문+숫자 혼합이어도 검색 결과의 code=###### 를 우선 사용.
     """
-    try:
-        q = normalize_search_query(query)
-        if not q:
-            return None
+    q = normalize_search_query(query)
+    if not q:
+        return None
+
+    cached = SEARCH_CACHE.get(q)
+    if cached is not None:
+        return cached
+
+    code = await _search_krx_code_from_naver(q)
+    # 일시적 실패로 None 이 고정되지 않도록 찾은 코드만 캐시
+    if code:
+        SEARCH_CACHE[q] = code
+    return code
+
 
+async def _search_krx_code_from_naver(q: str) -> str | None:
+    try:
         # 1차: 네이버 금융 통합검색
         search_url = f"https://finance.naver.com/search/search.naver?query={quote(q)}"
-        response = requests.get(search_url, headers=NAVER_HEADERS, timeout=10)
+        response = await NAVER_CLIENT.get(search_url)
         response.raise_for_status()
         text = response.text
 
-        codes = re.findall(r"code=([0-9A-Z]{6,12})", text)
-        if codes:
-            return codes[0]
+        # 첫 번째 코드만 쓰므로 findall 대신 search 로 첫 매치에서 멈춘다
+        m = CODE_PARAM_RE.search(text)
+        if m:
+            return m.group(1)
 
         # 2차: 모바일 검색 fallback
         mobile_url = f"https://m.stock.naver.com/search/index?q={quote(q)}"
-        response = requests.get(mobile_url, headers=NAVER_HEADERS, timeout=10)
+        response = await NAVER_CLIENT.get(mobile_url)
         response.raise_for_status()
         text = response.text
 
-        codes = re.findall(r'"stockCode"\s*:\s*"([0-9A-Z]{6,12})"', text)
-        if codes:
-            return codes[0]
-
-        codes = re.findall(r"/stock/([0-9A-Z]{6,12})", text)
-        if codes:
-            return codes[0]
+        m = MOBILE_STOCK_CODE_RE.search(text) or MOBILE_STOCK_PATH_RE.search(text)
+        if m:
+            return m.group(1)
 
         return None
-    except Exception:
+    except Exception as e:
+        logger.warning("Naver search fail (%s): %s", q, e)
         return None
 
 
 
-def fetch_from_krx(symbol: str, pages: int = 12) -> pd.DataFrame | None:
-    try:
-        symbol = str(symbol).strip().upper()
-        if symbol.isdigit():
-            symbol = symbol.zfill(6)
-        all_dfs = []
+KRX_COLUMNS = ["Date", "Open", "High", "Low", "Close", "Volume"]
+# 페이지마다 XPath 문자열을 다시 컴파일하지 않도록 모듈 로드 시 한 번만 컴파일
+KRX_ROW_XPATH = etree.XPath("//table[.//th[contains(., '종가')]]//tr")
+KRX_CELL_XPATH = etree.XPath("./td")
+# KRX_COLUMNS 순서로 읽을 셀 위치 (날짜, 시가, 고가, 저가, 종가, 거래량)
+KRX_CELL_ORDER = (0, 3, 4, 5, 1, 6)
 
-        for page in range(1, pages + 1):
-            url = f"https://finance.naver.com/item/sise_day.nhn?code={symbol}&page={page}"
-            response = requests.get(url, headers=NAVER_HEADERS, timeout=10)
-            response.raise_for_status()
-            dfs = pd.read_html(StringIO(response.text), header=0)
-            if dfs:
-                all_dfs.append(dfs[0])
 
-        if not all_dfs:
-            return None
+@lru_cache(maxsize=4)
+def html_parser(encoding: str) -> lxml.html.HTMLParser:
+    return lxml.html.HTMLParser(encoding=encoding)
 
-        df = pd.concat(all_dfs, ignore_index=True)
-        df = df.dropna(how="all")
 
-        if "날짜" not in df.columns:
-            return None
+def parse_krx_daily_rows(content: bytes, encoding: str) -> list[tuple[str, ...]]:
+    # sise_day 표 고정 스키마: 날짜 | 종가 | 전일비 | 시가 | 고가 | 저가 | 거래량
+    # 필요한 셀만 바로 뽑아 표 전체 탐색/헤더 추론/rename 을 생략
+    # 응답 바이트를 lxml(C)에서 바로 디코딩 (파이썬 str 변환 생략)
+    tree = lxml.html.fromstring(content, parser=html_parser(encoding))
+    rows = []
+    for tr in KRX_ROW_XPATH(tree):
+        tds = KRX_CELL_XPATH(tr)
+        if len(tds) != 7:
+            continue
+        # 쓰지 않는 전일비 셀(아이콘/중첩 span)은 텍스트를 만들지 않는다
+        row = tuple(tds[i].text_content().strip() for i in KRX_CELL_ORDER)
+        if row[0]:
+            rows.append(row)
+    return rows
 
-        df["날짜"] = pd.to_datetime(df["날짜"], errors="coerce")
-        df = df.dropna(subset=["날짜"])
-
-        df = df.rename(
-            columns={
-                "날짜": "Date",
-                "종가": "Close",
-                "거래량": "Volume",
-                "고가": "High",
-                "저가": "Low",
-                "시가": "Open",
-            }
+
+async def fetch_krx_page_rows(url: str) -> list[tuple[str, ...]]:
+    # 도착한 페이지는 바로 파싱: 나머지 페이지 응답을 기다리는 동안 파싱이 끝난다
+    response = await NAVER_CLIENT.get(url)
+    response.raise_for_status()
+    return parse_krx_daily_rows(response.content, response.charset_encoding or "euc-kr")
+
+
+async def fetch_from_krx(symbol: str, pages: int = 12) -> pd.DataFrame | None:
+    try:
+        symbol = str(symbol).strip().upper()
+        if symbol.isdigit():
+            symbol = symbol.zfill(6)
+        # 페이지끼리 독립적이므로 한 번에 요청 (한 페이지라도 실패하면 기존처럼 전체 실패)
+        page_rows = await asyncio.gather(
+            *(
+                fetch_krx_page_rows(f"https://finance.naver.com/item/sise_day.nhn?code={symbol}&page={page}")
+                for page in range(1, pages + 1)
+            )
         )
+        # 전 페이지 행을 한 리스트에 모아 DataFrame 을 한 번만 생성 (페이지별 프레임 + concat 생략)
+        rows = [row for rows_of_page in page_rows for row in rows_of_page]
+        if not rows:
+            return None
+        df = pd.DataFrame.from_records(rows, columns=KRX_COLUMNS)
 
-        for col in ["Open", "High", "Low", "Close", "Volume"]:
-            if col in df.columns:
-                df[col] = df[col].astype(str).str.replace(",", "", regex=False)
-                df[col] = pd.to_numeric(df[col], errors="coerce")
+        # 네이버 날짜는 항상 YYYY.MM.DD: 형식을 지정해 추론 없이 고정 형식 파서로 변환
+        df["Date"] = pd.to_datetime(df["Date"], format="%Y.%m.%d", errors="coerce")
+
+        # 다섯 컬럼의 쉼표 제거/숫자 변환을 2차원 배열 한 번으로 처리 (정밀도 유지를 위해 float64)
+        num_cols = ["Open", "High", "Low", "Close", "Volume"]
+        raw = np.char.replace(df[num_cols].to_numpy(dtype=str), ",", "")
+        df[num_cols] = pd.to_numeric(raw.ravel(), errors="coerce").reshape(raw.shape)
 
         df = df.dropna(subset=["Date", "Open", "High", "Low", "Close", "Volume"])
-        df = df.sort_values("Date").drop_duplicates(subset=["Date"], keep="last").reset_index(drop=True)
-        return df[["Date", "Open", "High", "Low", "Close", "Volume"]]
-    except Exception:
+        # 네이버 일별 시세는 최신순이므로 배열만 뒤집으면 오름차순 (새 RangeIndex 포함)
+        df = pd.DataFrame({col: df[col].to_numpy()[::-1].copy() for col in KRX_COLUMNS})
+        if not (df["Date"].is_monotonic_increasing and df["Date"].is_unique):
+            # 조회 중 날짜가 바뀌어 페이지 경계가 밀린 경우 등에만 정렬/중복 제거
+            df = df.sort_values("Date").drop_duplicates(subset=["Date"], keep="last").reset_index(drop=True)
+        return df
+    except Exception as e:
+        logger.warning("KRX fetch fail (%s): %s", symbol, e)
         return None
 
 
 
-def fetch_from_finnhub(symbol: str, lookback_days: int = 400) -> pd.DataFrame | None:
+async def fetch_from_finnhub(symbol: str, lookback_days: int = 400) -> pd.DataFrame | None:
     if not FINNHUB_API_KEY:
         return None
 
@@ -294,19 +377,18 @@ def fetch_from_finnhub(symbol: str, lookback_days: int = 400) -> pd.DataFrame |
         date_from = int((now - pd.Timedelta(days=lookback_days)).timestamp())
         date_to = int(now.timestamp())
 
-        response = requests.get(
+        response = await FINNHUB_CLIENT.get(
             f"{FINNHUB_BASE_URL}/stock/candle",
             params={
                 "symbol": symbol,
                 "resolution": "D",
                 "from": date_from,
                 "to": date_to,
-                "token": FINNHUB_API_KEY,
             },
-            timeout=15,
+            timeout=httpx.Timeout(15.0, connect=3.0),
         )
         response.raise_for_status()
-        payload = response.json()
+        payload = orjson.loads(response.content)
 
         if not isinstance(payload, dict) or payload.get("s") != "ok":
             return None
@@ -315,21 +397,26 @@ def fetch_from_finnhub(symbol: str, lookback_days: int = 400) -> pd.DataFrame |
         if any(k not in payload for k in required_keys):
             return None
 
+        # 숫자 배열은 바로 float64 ndarray 로 만들어 컬럼별 dtype 추론/변환을 생략
         df = pd.DataFrame(
             {
                 "Date": pd.to_datetime(payload["t"], unit="s", utc=True).tz_localize(None),
-                "Open": pd.to_numeric(payload["o"], errors="coerce"),
-                "High": pd.to_numeric(payload["h"], errors="coerce"),
-                "Low": pd.to_numeric(payload["l"], errors="coerce"),
-                "Close": pd.to_numeric(payload["c"], errors="coerce"),
-                "Volume": pd.to_numeric(payload["v"], errors="coerce"),
+                "Open": np.asarray(payload["o"], dtype=np.float64),
+                "High": np.asarray(payload["h"], dtype=np.float64),
+                "Low": np.asarray(payload["l"], dtype=np.float64),
+                "Close": np.asarray(payload["c"], dtype=np.float64),
+                "Volume": np.asarray(payload["v"], dtype=np.float64),
             }
         )
 
         df = df.dropna(subset=["Date", "Open", "High", "Low", "Close", "Volume"])
         df = df.sort_values("Date").drop_duplicates(subset=["Date"], keep="last").reset_index(drop=True)
         return df
-    except Exception:
+    except httpx.HTTPStatusError as e:
+        logger.warning("Finnhub fetch fail (%s): HTTP %d", symbol, e.response.status_code)
+        return None
+    except Exception as e:
+        logger.warning("Finnhub fetch fail (%s): %s", symbol, type(e).__name__)
         return None
 
 
@@ -339,25 +426,24 @@ def normalize_yahoo_df(df: pd.DataFrame) -> pd.DataFrame | None:
         if df is None or df.empty:
             return None
 
+        # 입력 프레임(캐시/호출자 소유)은 건드리지 않고 필요한 6개 컬럼만으로 새 프레임을 만든다
         if isinstance(df.columns, pd.MultiIndex):
-            df.columns = [c[0] if isinstance(c, tuple) else c for c in df.columns]
-
+            df = df.set_axis(df.columns.get_level_values(0), axis=1)
         df = df.reset_index()
-        rename_map = {"Adj Close": "Adj_Close"}
-        df = df.rename(columns=rename_map)
 
         required = ["Date", "Open", "High", "Low", "Close", "Volume"]
-        for col in required:
-            if col not in df.columns:
-                return None
+        if any(col not in df.columns for col in required):
+            return None
 
+        out = pd.DataFrame({"Date": pd.to_datetime(df["Date"], errors="coerce")})
         for col in ["Open", "High", "Low", "Close", "Volume"]:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+            out[col] = pd.to_numeric(df[col], errors="coerce")
 
-        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-        df = df.dropna(subset=["Date", "Open", "High", "Low", "Close", "Volume"])
-        df = df.sort_values("Date").drop_duplicates(subset=["Date"], keep="last").reset_index(drop=True)
-        return df[["Date", "Open", "High", "Low", "Close", "Volume"]]
+        out = out.dropna().reset_index(drop=True)
+        # 야후 일봉은 보통 날짜 오름차순이므로 어긋난 경우에만 정렬/중복 제거
+        if not (out["Date"].is_monotonic_increasing and out["Date"].is_unique):
+            out = out.sort_values("Date").drop_duplicates(subset=["Date"], keep="last").reset_index(drop=True)
+        return out
     except Exception:
         return None
 
@@ -388,30 +474,53 @@ def build_yahoo_candidates(symbol: str) -> list[str]:
 
 
 
-def fetch_from_yahoo(symbol: str) -> pd.DataFrame | None:
+@cached(cache=YAHOO_CACHE, lock=YAHOO_CACHE_LOCK)
+def download_yahoo(candidate: str) -> pd.DataFrame | None:
+    # 후보 티커별 정규화 결과(없음 포함)를 캐시: .KS 실패 후 .KQ 처럼 반복되는 왕복을 생략
+    # yfinance 는 import 비용이 커서 Yahoo 폴백이 실제로 필요할 때 불러온다
+    import yfinance as yf
+
+    # yf.download 는 모듈 전역 상태를 공유해 스레드 동시 호출에 안전하지 않으므로 Ticker 단위로 조회
+    df = yf.Ticker(candidate).history(period="1y", interval="1d", auto_adjust=False)
+    if df is not None and isinstance(df.index, pd.DatetimeIndex) and df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    return normalize_yahoo_df(df)
+
+
+async def fetch_from_yahoo(symbol: str) -> pd.DataFrame | None:
     try:
-        for candidate in build_yahoo_candidates(symbol):
-            df = yf.download(candidate, period="1y", interval="1d", progress=False, auto_adjust=False)
-            normalized = normalize_yahoo_df(df)
+        # 후보(.KS/.KQ/원문)를 스레드에서 동시에 받고, 우선순위 순서대로 첫 유효 결과 선택
+        candidates = build_yahoo_candidates(symbol)
+        # 한 후보의 예외가 다른 후보의 결과를 버리지 않도록 예외도 결과로 받는다
+        results = await asyncio.gather(
+            *(asyncio.to_thread(download_yahoo, c) for c in candidates), return_exceptions=True
+        )
+        for candidate, normalized in zip(candidates, results):
+            if isinstance(normalized, BaseException):
+                logger.debug("Yahoo candidate fail (%s): %s", candidate, normalized)
+                continue
             if normalized is not None and not normalized.empty:
                 return normalized
         return None
-    except Exception:
+    except Exception as e:
+        logger.warning("Yahoo fetch fail (%s): %s", symbol, e)
         return None
 
 
 
-def resolve_krx_code(symbol: str) -> str | None:
-    # 1차: 입력값에서 가능한 국내 코드 후보들을 직접 생성
-    for code in extract_krx_candidates(symbol):
-        return code
-
-    # 2차: 네이버 검색으로 국내 종목/ETF/ETN/레버리지 해석
-    return search_krx_code_from_naver(symbol)
+async def fetch_stock_data(symbol: str) -> tuple[pd.DataFrame | None, str]:
+    key = str(symbol).strip().upper()
+    cached = STOCK_CACHE.get(key)
+    if cached is not None:
+        return cached
 
+    df, source = await _fetch_stock_data(symbol)
+    if df is not None and not df.empty:
+        STOCK_CACHE[key] = (df, source)
+    return df, source
 
 
-def fetch_stock_data(symbol: str) -> tuple[pd.DataFrame | None, str]:
+async def _fetch_stock_data(symbol: str) -> tuple[pd.DataFrame | None, str]:
     raw_symbol = str(symbol).strip()
     normalized_symbol = normalize_symbol(raw_symbol)
 
@@ -421,13 +530,13 @@ def fetch_stock_data(symbol: str) -> tuple[pd.DataFrame | None, str]:
     # 1) 국내 문자열 검색 우선
     # 숫자 6자리뿐 아니라 숫자+영문+특수문자 조합 6문자 이상도 국내 검색 대상으로 본다.
     if is_possible_domestic_query(raw_symbol):
-        resolved_code = search_krx_code_from_naver(raw_symbol)
+        resolved_code = await search_krx_code_from_naver(raw_symbol)
         if resolved_code:
-            df = fetch_from_krx(resolved_code)
+            df = await fetch_from_krx(resolved_code)
             if df is not None and not df.empty:
                 return df, "KRX_SEARCH"
 
-            df = fetch_from_yahoo(resolved_code)
+            df = await fetch_from_yahoo(resolved_code)
             if df is not None and not df.empty:
                 return df, "YAHOO_KRX_SEARCH"
 
@@ -438,26 +547,26 @@ def fetch_stock_data(symbol: str) -> tuple[pd.DataFrame | None, str]:
         krx_candidates.append(direct_code)
 
     for krx_code in krx_candidates:
-        df = fetch_from_krx(krx_code)
+        df = await fetch_from_krx(krx_code)
         if df is not None and not df.empty:
             return df, "KRX"
 
-        df = fetch_from_yahoo(krx_code)
+        df = await fetch_from_yahoo(krx_code)
         if df is not None and not df.empty:
             return df, "YAHOO_KRX"
 
     # 3) 해외/일반 티커 처리
     if normalized_symbol:
-        df = fetch_from_finnhub(normalized_symbol)
+        df = await fetch_from_finnhub(normalized_symbol)
         if df is not None and not df.empty:
             return df, "FINNHUB"
 
-        df = fetch_from_yahoo(normalized_symbol)
+        df = await fetch_from_yahoo(normalized_symbol)
         if df is not None and not df.empty:
             return df, "YAHOO"
 
     # 4) 마지막으로 원문을 야후 후보군에 넣어서 한 번 더 시도
-    df = fetch_from_yahoo(raw_symbol)
+    df = await fetch_from_yahoo(raw_symbol)
     if df is not None and not df.empty:
         return df, "YAHOO_RAW"
 
@@ -465,88 +574,147 @@ def fetch_stock_data(symbol: str) -> tuple[pd.DataFrame | None, str]:
 
 
 
-def fetch_vix() -> pd.DataFrame | None:
+async def fetch_vix() -> pd.DataFrame | None:
     try:
-        response = requests.get("https://fred.stlouisfed.org/graph/fredgraph.csv?id=VIXCLS", timeout=10)
+        # 지표는 마지막 VIX 와 5일 평균만 쓰므로 최근 구간만 내려받는다 (전체 이력은 1990년부터)
+        start = (datetime.now(MARKET_TZ) - timedelta(days=VIX_LOOKBACK_DAYS)).strftime("%Y-%m-%d")
+        response = await FRED_CLIENT.get(
+            "https://fred.stlouisfed.org/graph/fredgraph.csv",
+            params={"id": "VIXCLS", "cosd": start},
+        )
         response.raise_for_status()
 
-        vix = pd.read_csv(StringIO(response.text))
-        vix.columns = ["Date", "VIX"]
-        vix["Date"] = pd.to_datetime(vix["Date"], errors="coerce")
-        vix["VIX"] = pd.to_numeric(vix["VIX"], errors="coerce")
-        vix = vix.dropna(subset=["Date"]).sort_values("Date").reset_index(drop=True)
+        # 컬럼명/타입/결측 표기(".")를 미리 지정해 추론과 사후 변환을 생략
+        vix = pd.read_csv(
+            BytesIO(response.content),
+            engine="c",
+            header=0,
+            usecols=[0, 1],
+            names=["Date", "VIX"],
+            dtype={"VIX": np.float64},
+            na_values=["."],
+            parse_dates=["Date"],
+            date_format="%Y-%m-%d",
+        )
+        # FRED 는 날짜 오름차순이므로 보통은 그대로 사용, 형식이 어긋난 경우에만 정리/정렬
+        if vix["Date"].dtype.kind != "M" or not vix["Date"].is_monotonic_increasing:
+            vix["Date"] = pd.to_datetime(vix["Date"], errors="coerce")
+            vix = vix.dropna(subset=["Date"]).sort_values("Date").reset_index(drop=True)
         return vix
-    except Exception:
+    except Exception as e:
+        logger.warning("VIX fetch fail: %s", e)
         return None
 
 
 
+def response_cache_key(symbol: str, decision: str | None) -> tuple:
+    return str(symbol).strip(), decision, datetime.now(MARKET_TZ).date()
+
+
 def merge_vix(stock_df: pd.DataFrame, vix_df: pd.DataFrame | None) -> pd.DataFrame:
     if stock_df is None or stock_df.empty:
         return stock_df
 
-    merged = stock_df.copy()
+    # 캐시된 시세 프레임은 공유되므로 수정하지 않고, 새 프레임은 assign/merge 한 번으로만 만든다
     if vix_df is None or vix_df.empty:
-        merged["VIX"] = pd.NA
-        return merged
+        return stock_df.assign(VIX=pd.NA)
 
-    merged = pd.merge(merged, vix_df, on="Date", how="left")
+    merged = pd.merge(stock_df, vix_df, on="Date", how="left")
     merged["VIX"] = merged["VIX"].ffill()
     return merged
 
 
+def indicator_cache_key(symbol: str, data: pd.DataFrame, vix_df: pd.DataFrame | None) -> tuple:
+    # 같은 종목의 같은 마지막 봉 + 같은 VIX 구간이면 지표가 같다 (VIX 당일 값이 채워지면 개수가 바뀜)
+    vix_part = None
+    if vix_df is not None and not vix_df.empty:
+        vix_part = (len(vix_df), vix_df["Date"].iat[-1], int(vix_df["VIX"].count()))
+    return str(symbol).strip().upper(), len(data), data["Date"].iat[-1], float(data["Close"].iat[-1]), vix_part
+
+
+async def compute_indicators(symbol: str, data: pd.DataFrame, vix_df: pd.DataFrame | None) -> dict:
+    # 매수/매도/dual/배치 요청이 같은 시세를 보면 VIX 병합과 지표 계산을 한 번만 한다
+    key = indicator_cache_key(symbol, data, vix_df)
+    indicators = INDICATOR_CACHE.get(key)
+    if indicators is None:
+        # 지표 계산은 CPU 작업이므로 이벤트 루프 밖에서 실행
+        indicators = await asyncio.to_thread(calculate_indicators, merge_vix(data, vix_df))
+        INDICATOR_CACHE[key] = indicators
+    return indicators
+
+
+async def build_signal_response(
+    symbol: str, decision: str, data: pd.DataFrame, source: str, vix: pd.DataFrame | None
+) -> dict:
+    indicators = await compute_indicators(symbol, data, vix)
+    result = generate_signal(indicators, decision)
+    scores = safe_floats(result, ("score", "strength", "position_size"))
+
+    return {
+        "symbol": symbol,
+        "source": source,
+        "recommendation": result["recommendation"],
+        "conviction_score": scores["score"],
+        "strength_level": scores["strength"],
+        "position_size": scores["position_size"],
+        "color": result.get("color"),
+        "reason": result.get("reason"),
+        "indicators": indicators,
+    }
+
+
 @app.post("/analyze")
-def analyze_stock(req: AnalysisRequest, request: Request):
+async def analyze_stock(req: AnalysisRequest, request: Request):
+    logger.debug("analyze request: symbol=%s decision=%s", req.symbol, req.decision)
     try:
-        if req.decision not in ["매수", "매도"]:
+        if req.decision not in DECISIONS:
             raise HTTPException(status_code=400, detail="decision은 '매수' 또는 '매도'여야 합니다.")
 
-        data, source = fetch_stock_data(req.symbol)
+        cache_key = response_cache_key(req.symbol, req.decision)
+        cached = RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # 시세와 VIX 는 서로 독립적이므로 동시에 조회
+        (data, source), vix = await asyncio.gather(fetch_stock_data(req.symbol), fetch_vix())
         if data is None or data.empty:
-            return JSONResponse(
+            return ORJSONResponse(
                 content={"symbol": req.symbol, "message": "검출안됨", "source": source},
                 status_code=404,
             )
+        logger.debug("data loaded: symbol=%s source=%s rows=%d", req.symbol, source, len(data))
 
-        vix = fetch_vix()
-        data = merge_vix(data, vix)
-        indicators = calculate_indicators(data)
-        result = generate_signal(indicators, req.decision)
-
-        return {
-            "symbol": req.symbol,
-            "source": source,
-            "recommendation": result["recommendation"],
-            "conviction_score": safe_float(result.get("score")),
-            "strength_level": safe_float(result.get("strength")),
-            "position_size": safe_float(result.get("position_size")),
-            "color": result.get("color"),
-            "reason": result.get("reason"),
-            "indicators": indicators,
-        }
+        response = await build_signal_response(req.symbol, req.decision, data, source, vix)
+        RESPONSE_CACHE[cache_key] = response
+        return response
     except HTTPException:
         raise
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("analyze failed: symbol=%s", req.symbol)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/analyze-dual")
-def analyze_stock_dual(req: AnalysisRequest, request: Request):
+async def analyze_stock_dual(req: AnalysisRequest, request: Request):
+    logger.debug("analyze-dual request: symbol=%s", req.symbol)
     try:
-        data, source = fetch_stock_data(req.symbol)
+        cache_key = response_cache_key(req.symbol, "dual")
+        cached = RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+        (data, source), vix = await asyncio.gather(fetch_stock_data(req.symbol), fetch_vix())
         if data is None or data.empty:
-            return JSONResponse(
+            return ORJSONResponse(
                 content={"symbol": req.symbol, "message": "검출안됨", "source": source},
                 status_code=404,
             )
+        logger.debug("data loaded: symbol=%s source=%s rows=%d", req.symbol, source, len(data))
 
-        vix = fetch_vix()
-        data = merge_vix(data, vix)
-        indicators = calculate_indicators(data)
+        indicators = await compute_indicators(req.symbol, data, vix)
         result = generate_dual_signal(indicators)
 
-        return {
+        response = {
             "symbol": req.symbol,
             "source": source,
             "final_decision": result["final_decision"],
@@ -554,11 +722,79 @@ def analyze_stock_dual(req: AnalysisRequest, request: Request):
             "sell_signal": result["sell_signal"],
             "indicators": indicators,
         }
+        RESPONSE_CACHE[cache_key] = response
+        return response
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("analyze-dual failed: symbol=%s", req.symbol)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/analyze-batch")
+async def analyze_stock_batch(req: BatchRequest):
+    logger.debug("analyze-batch request: symbols=%d decision=%s", len(req.symbols), req.decision)
+    if req.decision not in DECISIONS:
+        raise HTTPException(status_code=400, detail="decision은 '매수' 또는 '매도'여야 합니다.")
+
+    symbols = list(dict.fromkeys(s.strip() for s in req.symbols if s and s.strip()))
+    if not symbols:
+        raise HTTPException(status_code=400, detail="symbols가 비어 있습니다.")
+    if len(symbols) > BATCH_MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"symbols는 최대 {BATCH_MAX_SYMBOLS}개까지 가능합니다.")
+
+    cache_keys = {symbol: response_cache_key(symbol, req.decision) for symbol in symbols}
+    results = {symbol: RESPONSE_CACHE.get(key) for symbol, key in cache_keys.items()}
+    missing = [symbol for symbol, cached in results.items() if cached is None]
+
+    if missing:
+        async def fetch_limited(symbol: str):
+            async with BATCH_FETCH_LIMIT:
+                return await fetch_stock_data(symbol)
+
+        # VIX 는 모든 종목이 공유하므로 한 번만 받고, 종목 시세는 BATCH_FETCH_LIMIT 개씩 동시에 조회
+        vix, *loaded = await asyncio.gather(fetch_vix(), *(fetch_limited(s) for s in missing))
+
+        async def analyze_one(symbol: str, data: pd.DataFrame | None, source: str) -> dict:
+            if data is None or data.empty:
+                return {"symbol": symbol, "message": "검출안됨", "source": source}
+            try:
+                response = await build_signal_response(symbol, req.decision, data, source, vix)
+            except Exception as e:
+                logger.exception("analyze-batch failed: symbol=%s", symbol)
+                return {"symbol": symbol, "message": str(e), "source": source}
+            RESPONSE_CACHE[cache_keys[symbol]] = response
+            return response
+
+        analyzed = await asyncio.gather(
+            *(analyze_one(symbol, data, source) for symbol, (data, source) in zip(missing, loaded))
+        )
+        results.update(zip(missing, analyzed))
+
+    return {"count": len(symbols), "results": [results[symbol] for symbol in symbols]}
+
+
+# async: YAHOO 외 캐시는 락 없이 이벤트 루프에서만 쓰이므로 clear 도 루프 스레드에서 한다
+@app.post("/cache/clear")
+async def clear_cache(x_admin_token: str | None = Header(default=None)):
+    if not ADMIN_TOKEN or not hmac.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="권한이 없습니다.")
+
+    cleared = {
+        "stock": len(STOCK_CACHE),
+        "response": len(RESPONSE_CACHE),
+        "yahoo": len(YAHOO_CACHE),
+        "search": len(SEARCH_CACHE),
+        "indicator": len(INDICATOR_CACHE),
+    }
+    STOCK_CACHE.clear()
+    RESPONSE_CACHE.clear()
+    SEARCH_CACHE.clear()
+    INDICATOR_CACHE.clear()
+    with YAHOO_CACHE_LOCK:
+        YAHOO_CACHE.clear()
+    logger.info("caches cleared: %s", cleared)
+    return {"status": "ok", "cleared": cleared}
+
+
 @app.get("/")
 def root():
     return {
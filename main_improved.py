@@ -4,24 +4,149 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import math
 import os
+import threading
 import time
-from io import StringIO
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+from zoneinfo import ZoneInfo
 
+import httpx
+import lxml.html
+from lxml import etree
+import msgspec
+import numpy as np
+import orjson
 import pandas as pd
-import requests
-from fastapi import FastAPI
+from cachetools import TTLCache, cached
+from fastapi import FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, ConfigDict
 
-from trade_decider_v2 import calculate_indicators, auto_generate_signal
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # response cache is optional
+    aioredis = None
+
+from trade_decider_v2 import COLOR_NONE, calculate_indicators, auto_generate_signal, warm_up
 
 FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY", "")
 ALLOW_YAHOO_FALLBACK = os.getenv("ALLOW_YAHOO_FALLBACK", "0") == "1"
+REDIS_URL = os.getenv("REDIS_URL", "")
+
+# response cache TTLs (seconds): short while the market is open, long after close
+CACHE_TTL_OPEN = 10
+CACHE_TTL_CLOSED = 3600
+CACHE_TTL_STALE = 7 * 24 * 3600
+MARKET_TZ = ZoneInfo("Asia/Seoul")
+
+# process-local caches: yfinance history per symbol, indicators per data window
+YAHOO_CACHE = TTLCache(maxsize=1024, ttl=60)
+INDICATOR_CACHE = TTLCache(maxsize=1024, ttl=600)
+INDICATOR_LOCK = threading.Lock()
+
+# indicator/signal work runs here so the event loop keeps serving other requests
+POOL = ThreadPoolExecutor(max_workers=min(8, (os.cpu_count() or 1) * 2))
+
+# Naver pages: fail fast on connect, keep the 12s overall budget
+NAVER_TIMEOUT = httpx.Timeout(12.0, connect=3.0)
+
+BATCH_MAX_SYMBOLS = 50
+YAHOO_BATCH_SIZE = 20
+
+# shared outbound HTTP client (created in lifespan) + cap on concurrent provider calls
+HTTP: httpx.AsyncClient | None = None
+FETCH_LIMIT = asyncio.Semaphore(8)
+REDIS = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global HTTP, REDIS
+    HTTP = httpx.AsyncClient(
+        timeout=httpx.Timeout(20.0, connect=3.0),
+        transport=httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=2,  # connect errors only; a slow provider is not re-asked
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        ),
+    )
+    if REDIS_URL and aioredis is not None:
+        # short socket timeouts: an unreachable Redis falls through to the providers instead of stalling requests
+        REDIS = aioredis.from_url(REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5)
+    # JIT the indicator kernel at startup instead of on the first /analyze
+    await asyncio.get_running_loop().run_in_executor(POOL, warm_up)
+    try:
+        yield
+    finally:
+        await HTTP.aclose()
+        HTTP = None
+        if REDIS is not None:
+            await REDIS.aclose()
+            REDIS = None
+
+
+async def _get(url: str, **kwargs) -> httpx.Response:
+    async with FETCH_LIMIT:
+        return await HTTP.get(url, **kwargs)
+
+
+def _cache_ttl() -> int:
+    now = datetime.now(MARKET_TZ)
+    if now.weekday() < 5 and 9 <= now.hour < 16:
+        return CACHE_TTL_OPEN
+    return CACHE_TTL_CLOSED
+
+
+async def _cache_get(key: str) -> bytes | None:
+    if REDIS is None:
+        return None
+    try:
+        return await REDIS.get(key)
+    except Exception:
+        return None
+
+
+async def _cache_set(key: str, value: bytes, ttl: int) -> None:
+    if REDIS is None:
+        return
+    try:
+        await REDIS.set(key, value, ex=ttl)
+    except Exception:
+        pass
+
+
+class ORJSONResponse(JSONResponse):
+    media_type = "application/json; charset=utf-8"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _bytes_response(body: bytes, cache_state: str, request: Request | None = None) -> Response:
+    # ETag is a hash of the body itself, so it changes exactly when the analysis does;
+    # browsers/CDNs may reuse it for the same window the server cache uses
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    max_age = 0 if cache_state == "STALE" else _cache_ttl()
+    headers = {"X-Cache": cache_state, "ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if request is not None and request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=ORJSONResponse.media_type, headers=headers)
+
 
-app = FastAPI(title="Improved LKBUY2 API")
+app = FastAPI(
+    title="Improved LKBUY2 API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -32,10 +157,58 @@ app.add_middleware(
 )
 
 class AnalysisRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, str_max_length=64)
+
+    symbol: str
+
+
+class BatchRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, str_max_length=64)
+
+    symbols: list[str]
+
+
+# response schema: msgspec encodes these straight to JSON bytes, no intermediate dicts
+class DebugInfo(msgspec.Struct):
+    data_source: str | None
+    rows: int
+    last_date: str | None
+    tried: list[dict]
+
+
+class AnalyzeResp(msgspec.Struct):
     symbol: str
+    recommendation: str
+    decision_side: str
+    conviction_score: float
+    buy_score: float
+    sell_score: float
+    strength_pct: int
+    strength: str
+    level: str
+    color: str
+    reason: str
+    thresholds: dict
+    weights: dict
+    indicators: dict[str, float]
+    debug: DebugInfo
+
+
+class BatchResp(msgspec.Struct):
+    count: int
+    # AnalyzeResp or an error dict per symbol; msgspec can't union a Struct with dict
+    results: list[Any]
+
+
+JSON_ENCODER = msgspec.json.Encoder()
+
+
+INDICATOR_KEYS = ("CCI", "OBV_trend", "RSI")
 
 
 def _safe_float(x):
+    if isinstance(x, (int, float)):
+        return float(x) if math.isfinite(x) else 0.0
     try:
         if x is None:
             return 0.0
@@ -45,7 +218,14 @@ def _safe_float(x):
         return 0.0
 
 
-def fetch_from_finnhub(symbol: str):
+def _safe_floats(values: dict, keys) -> dict:
+    # one vectorised NaN/inf scrub for the whole indicator dict
+    arr = np.array([values.get(k) for k in keys], dtype=np.float64)
+    arr[~np.isfinite(arr)] = 0.0
+    return dict(zip(keys, arr.tolist()))
+
+
+async def fetch_from_finnhub(symbol: str):
     try:
         url = "https://finnhub.io/api/v1/stock/candle"
         now = int(time.time())
@@ -57,143 +237,370 @@ def fetch_from_finnhub(symbol: str):
             "to": now,
             "token": FINNHUB_API_KEY,
         }
-        r = requests.get(url, params=params, timeout=20)
-        data = r.json()
+        r = await _get(url, params=params)
+        data = orjson.loads(r.content)
         if data.get("s") != "ok":
             return None, f"finnhub_status:{data.get('s')}"
+        t = np.asarray(data.get("t", []), dtype=np.int64)
+        ohlcv = [np.asarray(data.get(k, []), dtype=np.float64) for k in ("o", "h", "l", "c", "v")]
+        # Finnhub returns ascending candles; only reorder if that ever stops being true
+        if t.size > 1 and not np.all(np.diff(t) >= 0):
+            order = np.argsort(t, kind="stable")
+            t = t[order]
+            ohlcv = [col[order] for col in ohlcv]
+        keep = np.isfinite(np.vstack(ohlcv)).all(axis=0)
+        if not keep.all():
+            t = t[keep]
+            ohlcv = [col[keep] for col in ohlcv]
+        if t.size == 0:
+            return None, "finnhub_empty"
+        o, h, l, c, v = (col[-120:] for col in ohlcv)
         df = pd.DataFrame({
-            "Date": pd.to_datetime(data.get("t", []), unit="s"),
-            "Open": data.get("o", []),
-            "High": data.get("h", []),
-            "Low": data.get("l", []),
-            "Close": data.get("c", []),
-            "Volume": data.get("v", []),
+            "Date": t[-120:].astype("datetime64[s]"),
+            "Open": o,
+            "High": h,
+            "Low": l,
+            "Close": c,
+            "Volume": v,
         })
-        if df.empty:
-            return None, "finnhub_empty"
-        df = df.dropna().sort_values("Date").reset_index(drop=True)
-        return df.tail(120), None
+        return df, None
     except Exception as e:
         return None, f"finnhub_exception:{e}"
 
 
-def fetch_from_yahoo(symbol: str):
+@cached(cache=YAHOO_CACHE, lock=threading.Lock())
+def _yahoo_history(symbol: str):
     try:
         import yfinance as yf
         tk = yf.Ticker(symbol)
         df = tk.history(period="6mo", interval="1d", auto_adjust=False)
-        if df is None or df.empty:
-            return None, "yahoo_empty"
-        df = df.rename(columns=str.title)[["Open", "High", "Low", "Close", "Volume"]]
-        df = df.dropna().reset_index(drop=False)
-        if "Date" in df.columns:
-            df = df.sort_values("Date").reset_index(drop=True)
-        return df.tail(120), None
+        return _shape_yahoo(df)
     except Exception as e:
         return None, f"yahoo_error:{e}"
 
 
-def fetch_from_krx_naver(code: str, pages: int = 5):
+def _shape_yahoo(df: pd.DataFrame | None):
+    if df is None or df.empty:
+        return None, "yahoo_empty"
+    df = df.rename(columns=str.title)[["Open", "High", "Low", "Close", "Volume"]]
+    df = df.dropna().reset_index(drop=False)
+    if df.empty:
+        return None, "yahoo_empty"
+    if "Date" in df.columns:
+        df = df.sort_values("Date").reset_index(drop=True)
+    return df.tail(120), None
+
+
+def _yahoo_batch_history(symbols: list[str]) -> dict:
+    # one yf.download round trip for the whole chunk instead of one per symbol
+    try:
+        import yfinance as yf
+        raw = yf.download(
+            symbols,
+            period="6mo",
+            interval="1d",
+            group_by="ticker",
+            auto_adjust=False,
+            threads=True,
+            progress=False,
+        )
+    except Exception as e:
+        return {s: (None, f"yahoo_error:{e}") for s in symbols}
+    out = {}
+    for s in symbols:
+        try:
+            if isinstance(raw.columns, pd.MultiIndex):
+                df = raw[s] if s in raw.columns.get_level_values(0) else None
+            else:
+                df = raw
+            out[s] = _shape_yahoo(df)
+        except Exception as e:
+            out[s] = (None, f"yahoo_error:{e}")
+    return out
+
+
+async def fetch_from_yahoo(symbol: str):
+    # yfinance is blocking; keep it off the event loop
+    async with FETCH_LIMIT:
+        return await asyncio.to_thread(_yahoo_history, symbol)
+
+
+async def fetch_from_yahoo_batch(symbols: list[str]) -> dict:
+    async def run(chunk):
+        async with FETCH_LIMIT:
+            return await asyncio.to_thread(_yahoo_batch_history, chunk)
+
+    chunks = [symbols[i:i + YAHOO_BATCH_SIZE] for i in range(0, len(symbols), YAHOO_BATCH_SIZE)]
+    merged = {}
+    for part in await asyncio.gather(*(run(chunk) for chunk in chunks)):
+        merged.update(part)
+    return merged
+
+
+# compiled once; evaluating a precompiled XPath skips re-parsing the expression per page
+NAVER_ROW_XPATH = etree.XPath("//table[contains(@class, 'type2')]//tr")
+NAVER_CELL_XPATH = etree.XPath("./td")
+
+
+@lru_cache(maxsize=4)
+def _html_parser(encoding: str) -> lxml.html.HTMLParser:
+    return lxml.html.HTMLParser(encoding=encoding)
+
+
+def _parse_naver_daily(content: bytes, encoding: str) -> list[tuple[str, str, str, str, str]]:
+    # sise_day 표 고정 스키마: 날짜 | 종가 | 전일비 | 시가 | 고가 | 저가 | 거래량
+    # raw bytes go straight to libxml2, which decodes them in C
+    tree = lxml.html.fromstring(content, parser=_html_parser(encoding))
+    rows = []
+    for tr in NAVER_ROW_XPATH(tree):
+        tds = NAVER_CELL_XPATH(tr)
+        if len(tds) != 7:
+            continue
+        # date, close, high, low, volume; the change/open cells are never read
+        row = tuple(tds[i].text_content().strip() for i in (0, 1, 4, 5, 6))
+        if all(row):
+            rows.append(row)
+    return rows
+
+
+def _naver_numbers(cells) -> np.ndarray:
+    # "12,345" -> 12345.0 for the whole column in one pass; placeholders like "-" become NaN
+    raw = np.char.replace(np.asarray(cells, dtype=str), ",", "")
+    return pd.to_numeric(raw, errors="coerce").astype(np.float64, copy=False)
+
+
+async def _fetch_naver_rows(url: str, headers: dict) -> list[tuple[str, str, str, str, str]]:
+    # parse each page as soon as it lands, while the other pages are still in flight
+    res = await _get(url, headers=headers, timeout=NAVER_TIMEOUT)
+    return _parse_naver_daily(res.content, res.charset_encoding or "euc-kr")
+
+
+async def fetch_from_krx_naver(code: str, pages: int = 5):
     try:
         code = code.zfill(6)
         headers = {"User-Agent": "Mozilla/5.0"}
-        dfs = []
-        for page in range(1, pages + 1):
-            url = f"https://finance.naver.com/item/sise_day.naver?code={code}&page={page}"
-            res = requests.get(url, headers=headers, timeout=12)
-            tbls = pd.read_html(StringIO(res.text))
-            if not tbls:
-                continue
-            df = tbls[0]
-            dfs.append(df)
-        if not dfs:
+        urls = [
+            f"https://finance.naver.com/item/sise_day.naver?code={code}&page={page}"
+            for page in range(1, pages + 1)
+        ]
+        # pages are independent: fetch them all at once
+        page_rows = await asyncio.gather(
+            *(_fetch_naver_rows(url, headers) for url in urls),
+            return_exceptions=True,
+        )
+        # keep only the pages before the first failed or empty one, so a missing
+        # middle page can't leave a gap that the indicators would run straight across
+        rows = []
+        for part in page_rows:
+            if isinstance(part, Exception) or not part:
+                break
+            rows.extend(part)
+        if not rows:
             return None, "krx_no_tables"
-        df = pd.concat(dfs, ignore_index=True)
-        df = df.dropna().reset_index(drop=True)
-        df = df.rename(columns={
-            "날짜": "Date",
-            "종가": "Close",
-            "고가": "High",
-            "저가": "Low",
-            "거래량": "Volume",
+        # pages come newest first, so reversing the rows gives ascending dates without a sort
+        rows.reverse()
+        dates, closes, highs, lows, volumes = zip(*rows)
+        close = _naver_numbers(closes)
+        high = _naver_numbers(highs)
+        low = _naver_numbers(lows)
+        volume = _naver_numbers(volumes)
+        df = pd.DataFrame({
+            "Date": np.char.replace(np.asarray(dates, dtype=str), ".", "-").astype("datetime64[D]"),
+            "Open": (close + high + low) / 3.0,
+            "High": high,
+            "Low": low,
+            "Close": close,
+            "Volume": volume,
         })
-        for col in ["Close", "High", "Low", "Volume"]:
-            df[col] = pd.to_numeric(df[col].astype(str).str.replace(",", ""), errors="coerce")
-        df["Open"] = df[["Close", "High", "Low"]].mean(axis=1)
-        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-        df = df.dropna(subset=["Date"]).sort_values("Date").reset_index(drop=True)
-        return df[["Date", "Open", "High", "Low", "Close", "Volume"]].tail(180), None
+        # a row with any unparseable cell is dropped, not the whole fetch
+        valid = ~(np.isnan(close) | np.isnan(high) | np.isnan(low) | np.isnan(volume))
+        if not valid.all():
+            df = df[valid].reset_index(drop=True)
+        if not (df["Date"].is_monotonic_increasing and df["Date"].is_unique):
+            # e.g. the date rolled over between page requests and a page boundary shifted
+            df = df.sort_values("Date").drop_duplicates(subset="Date", keep="last").reset_index(drop=True)
+        return df.tail(180), None
     except Exception as e:
         return None, f"krx_exception:{e}"
 
 
+def _is_krx_code(symbol: str) -> bool:
+    return symbol.isdigit() and len(symbol) <= 6
+
+
+async def _fetch_each(fetch, symbols: list[str]) -> dict:
+    return dict(zip(symbols, await asyncio.gather(*(fetch(s) for s in symbols))))
+
+
+# providers in priority order; accept(is_krx) gets the symbol class computed once per request,
+# fetch_many (optional) serves a whole batch in one call
+Provider = namedtuple("Provider", "name fetch accept fetch_many", defaults=(None,))
+PROVIDERS = [
+    Provider("krx_naver", fetch_from_krx_naver, lambda is_krx: is_krx),
+    Provider("finnhub", fetch_from_finnhub, lambda is_krx: not is_krx),
+    Provider(
+        "yahoo",
+        fetch_from_yahoo,
+        lambda is_krx: ALLOW_YAHOO_FALLBACK and not is_krx,
+        fetch_from_yahoo_batch,
+    ),
+]
+
+
+def _cached_indicators(symbol: str, data: pd.DataFrame):
+    # same symbol + same trailing bars => same indicators; skip the rolling-window work
+    tail_hash = int(pd.util.hash_pandas_object(data.tail(5), index=False).sum())
+    key = (symbol.upper(), len(data), tail_hash)
+    with INDICATOR_LOCK:
+        indicators = INDICATOR_CACHE.get(key)
+    if indicators is None:
+        indicators = calculate_indicators(data)
+        with INDICATOR_LOCK:
+            INDICATOR_CACHE[key] = indicators
+    return indicators
+
+
+def _select_source(candidates):
+    # candidates: [(provider name, (df, err)), ...] in priority order
+    tried = []
+    for name, (df, err) in candidates:
+        if df is not None:
+            return df, name, tried
+        tried.append({"source": name, "error": err})
+    return None, None, tried
+
+
+async def _first_available(candidates):
+    # candidates: [(provider name, fetch coroutine), ...]; the first provider with data wins
+    tasks = {asyncio.create_task(fetch): name for name, fetch in candidates}
+    pending = set(tasks)
+    tried = []
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                df, err = task.result()
+                if df is not None:
+                    return df, tasks[task], tried
+                tried.append({"source": tasks[task], "error": err})
+        return None, None, tried
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _not_found(symbol: str, tried: list) -> dict:
+    return {"symbol": symbol, "message": "데이터 없음 또는 제공처 제한", "tried": tried}
+
+
+def _build_analysis(symbol: str, df: pd.DataFrame, source: str, tried: list) -> AnalyzeResp:
+    # calculate_indicators only reads its input, so a column view is enough
+    data = df[["Open", "High", "Low", "Close", "Volume"]]
+    indicators = _cached_indicators(symbol, data)
+    result = auto_generate_signal(indicators)
+
+    return AnalyzeResp(
+        symbol=symbol,
+        recommendation=result.get("recommendation", ""),
+        decision_side=result.get("decision_side", ""),
+        conviction_score=_safe_float(result.get("score")),
+        buy_score=_safe_float(result.get("buy_score")),
+        sell_score=_safe_float(result.get("sell_score")),
+        strength_pct=result.get("strength_pct", 0),
+        strength=result.get("strength", "0%"),
+        level=result.get("level", ""),
+        color=result.get("color", COLOR_NONE),
+        reason=result.get("reason", ""),
+        thresholds=result.get("thresholds", {}),
+        weights=result.get("weights", {}),
+        indicators=_safe_floats(indicators, INDICATOR_KEYS),
+        debug=DebugInfo(
+            data_source=source,
+            rows=len(df),
+            last_date=df["Date"].iloc[-1].strftime("%Y-%m-%d") if "Date" in df.columns else None,
+            tried=tried,
+        ),
+    )
+
+
 @app.get("/health")
 def health():
     return {"status": "ok", "mode": "automatic", "yahoo_fallback": ALLOW_YAHOO_FALLBACK}
 
 
+@app.get("/analyze")
+async def analyze_get(request: Request, symbol: str = Query(..., max_length=64)):
+    # idempotent GET form of /analyze so HTTP caches can serve repeats
+    return await analyze(AnalysisRequest(symbol=symbol), request)
+
+
 @app.post("/analyze")
-def analyze(req: AnalysisRequest):
+async def analyze(req: AnalysisRequest, request: Request):
     symbol = (req.symbol or "").strip()
     if not symbol:
-        return JSONResponse({"error": "symbol required"}, status_code=400)
+        return ORJSONResponse({"error": "symbol required"}, status_code=400)
 
-    df = None
-    source = None
-    tried = []
+    # the automatic endpoint has no user-supplied decision, so it is fixed in the key
+    today = datetime.now(MARKET_TZ).strftime("%Y-%m-%d")
+    cache_key = f"analyze:{symbol.upper()}:auto:{today}"
+    stale_key = f"analyze:stale:{symbol.upper()}:auto"
+    cached = await _cache_get(cache_key)
+    if cached is not None:
+        return _bytes_response(cached, "HIT", request)
 
-    if symbol.isdigit() and len(symbol) <= 6:
-        df, err = fetch_from_krx_naver(symbol)
-        source = "krx_naver"
-        if df is None:
-            tried.append({"source": "krx_naver", "error": err})
-    else:
-        df, err = fetch_from_finnhub(symbol)
-        if df is not None:
-            source = "finnhub"
-        else:
-            tried.append({"source": "finnhub", "error": err})
-            if ALLOW_YAHOO_FALLBACK:
-                df, yerr = fetch_from_yahoo(symbol)
-                if df is not None:
-                    source = "yahoo"
-                else:
-                    tried.append({"source": "yahoo", "error": yerr})
+    # all candidate providers are queried at once; latency is the fastest one that has data
+    is_krx = _is_krx_code(symbol)
+    candidates = [(p.name, p.fetch(symbol)) for p in PROVIDERS if p.accept(is_krx)]
+    df, source, tried = await _first_available(candidates)
 
     if df is None or df.empty:
-        return JSONResponse(
-            {"symbol": symbol, "message": "데이터 없음 또는 제공처 제한", "tried": tried},
-            status_code=404,
-        )
+        stale = await _cache_get(stale_key)
+        if stale is not None:
+            return _bytes_response(stale, "STALE", request)
+        return ORJSONResponse(_not_found(symbol, tried), status_code=404)
 
-    data = df[["Open", "High", "Low", "Close", "Volume"]].copy()
-    indicators = calculate_indicators(data)
-    result = auto_generate_signal(indicators)
+    loop = asyncio.get_running_loop()
+    resp = await loop.run_in_executor(POOL, _build_analysis, symbol, df, source, tried)
+    body = JSON_ENCODER.encode(resp)
+    await asyncio.gather(
+        _cache_set(cache_key, body, _cache_ttl()),
+        _cache_set(stale_key, body, CACHE_TTL_STALE),
+    )
+    return _bytes_response(body, "MISS", request)
 
-    resp = {
-        "symbol": symbol,
-        "recommendation": str(result.get("recommendation", "")),
-        "decision_side": str(result.get("decision_side", "")),
-        "conviction_score": _safe_float(result.get("score")),
-        "buy_score": _safe_float(result.get("buy_score")),
-        "sell_score": _safe_float(result.get("sell_score")),
-        "strength_pct": int(result.get("strength_pct", 0)),
-        "strength": str(result.get("strength", "0%")),
-        "level": str(result.get("level", "")),
-        "color": str(result.get("color", "#F44336")),
-        "reason": str(result.get("reason", "")),
-        "thresholds": result.get("thresholds", {}),
-        "weights": result.get("weights", {}),
-        "indicators": {
-            "CCI": _safe_float(indicators.get("CCI")),
-            "OBV_trend": _safe_float(indicators.get("OBV_trend")),
-            "RSI": _safe_float(indicators.get("RSI")),
-        },
-        "debug": {
-            "data_source": source,
-            "rows": int(len(df)),
-            "last_date": df["Date"].iloc[-1].strftime("%Y-%m-%d") if "Date" in df.columns else None,
-            "tried": tried,
-        },
+
+@app.post("/analyze_batch")
+async def analyze_batch(req: BatchRequest):
+    symbols = list(dict.fromkeys(s.strip() for s in req.symbols if s and s.strip()))
+    if not symbols:
+        return ORJSONResponse({"error": "symbols required"}, status_code=400)
+    if len(symbols) > BATCH_MAX_SYMBOLS:
+        return ORJSONResponse({"error": f"max {BATCH_MAX_SYMBOLS} symbols"}, status_code=400)
+
+    # every provider serves all of its symbols at once (multi-symbol download where it has one)
+    is_krx = {s: _is_krx_code(s) for s in symbols}
+    wanted = {p.name: [s for s in symbols if p.accept(is_krx[s])] for p in PROVIDERS}
+    fetched = dict(zip(
+        wanted,
+        await asyncio.gather(*(
+            p.fetch_many(wanted[p.name]) if p.fetch_many else _fetch_each(p.fetch, wanted[p.name])
+            for p in PROVIDERS
+        )),
+    ))
+
+    loaded = {
+        s: _select_source([(name, res[s]) for name, res in fetched.items() if s in res])
+        for s in symbols
     }
-    return JSONResponse(resp, media_type="application/json; charset=utf-8")
+
+    loop = asyncio.get_running_loop()
+
+    async def analyze_one(symbol: str) -> dict:
+        df, source, tried = loaded[symbol]
+        if df is None or df.empty:
+            return _not_found(symbol, tried)
+        return await loop.run_in_executor(POOL, _build_analysis, symbol, df, source, tried)
+
+    results = await asyncio.gather(*(analyze_one(s) for s in symbols))
+    body = JSON_ENCODER.encode(BatchResp(count=len(results), results=list(results)))
+    return Response(body, media_type=ORJSONResponse.media_type)
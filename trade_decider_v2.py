@@ -5,13 +5,24 @@
 
 from __future__ import annotations
 
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import Dict
+from enum import IntEnum
+from typing import Dict, Tuple
+import math
+import numpy as np
 import pandas as pd
-import ta
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the kernel then runs as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
 
-@dataclass
+
+@dataclass(frozen=True)
 class OptimalCombo:
     w_cci: float = 0.33
     w_rsi: float = 0.33
@@ -22,25 +33,115 @@ class OptimalCombo:
     min_action_strength: int = 20   # strong signal filter
 
 
-def calculate_indicators(data: pd.DataFrame) -> Dict[str, float]:
-    close = pd.Series(data["Close"].to_numpy().ravel())
-    volume = pd.Series(data["Volume"].to_numpy().ravel())
-    high = pd.Series(data["High"].to_numpy().ravel())
-    low = pd.Series(data["Low"].to_numpy().ravel())
+# the tuned combination is fixed, so one shared (immutable) instance serves every call
+COMBO = OptimalCombo()
+
+
+# strength colours, weakest (below threshold) to strongest
+COLOR_NONE = "#F44336"
+COLOR_MODERATE = "#FB8C00"
+COLOR_STRONG = "#FBC02D"
+COLOR_VERY_STRONG = "#2E7D32"
+
+
+@njit(cache=True)
+def _indicator_kernel(high, low, close, volume, cci_n, rsi_n, obv_lag):
+    # one forward pass for RSI, OBV and the CCI moving sum; MAD over the last window only.
+    # mirrors ta's CCIIndicator / OnBalanceVolumeIndicator / RSIIndicator last values
+    n = close.shape[0]
+    nan = math.nan
+
+    # RSI: Wilder smoothing, same update as ewm(alpha=1/n, adjust=False)
+    alpha = 1.0 / rsi_n
+    keep = 1.0 - alpha
+    norm = keep + alpha
+    avg_up = 0.0
+    avg_dn = 0.0
+    # OBV: unchanged close counts as +volume, like ta. Only the change over the last
+    # obv_lag bars is used, so sum just those steps instead of carrying the running level
+    obv_trend = 0.0
+    trend_start = n - obv_lag
+    # CCI: typical prices of the last cci_n bars in a ring buffer, window sum updated in O(1)
+    ring = np.empty(cci_n)
+    tp_sum = 0.0
+    for i in range(n):
+        tp = (high[i] + low[i] + close[i]) / 3.0
+        slot = i % cci_n
+        tp_sum += tp
+        if i >= cci_n:
+            tp_sum -= ring[slot]
+        ring[slot] = tp
+
+        if i > 0:
+            diff = close[i] - close[i - 1]
+            up = diff if diff > 0 else 0.0
+            dn = -diff if diff < 0 else 0.0
+            if avg_up != up:
+                avg_up = (keep * avg_up + alpha * up) / norm
+            if avg_dn != dn:
+                avg_dn = (keep * avg_dn + alpha * dn) / norm
+            if i >= trend_start:
+                obv_trend = obv_trend - volume[i] if diff < 0 else obv_trend + volume[i]
+
+    if n < rsi_n:
+        rsi = nan
+    elif avg_dn == 0:
+        rsi = 100.0
+    else:
+        rsi = 100.0 - 100.0 / (1.0 + avg_up / avg_dn)
 
-    cci_indicator = ta.trend.CCIIndicator(high=high, low=low, close=close, window=20)
-    cci = float(cci_indicator.cci().iloc[-1])
+    if n <= obv_lag:
+        obv_trend = 0.0
 
-    obv_indicator = ta.volume.OnBalanceVolumeIndicator(close=close, volume=volume)
-    obv = obv_indicator.on_balance_volume()
-    obv_trend = float(obv.iloc[-1] - obv.iloc[-8]) if len(obv) >= 8 else 0.0
+    if n < cci_n:
+        cci = nan
+    else:
+        mean = tp_sum / cci_n
+        last = ring[(n - 1) % cci_n]
+        mad = 0.0
+        flat = True
+        # walk the ring oldest to newest so the MAD sum keeps its original order
+        for i in range(n - cci_n, n):
+            value = ring[i % cci_n]
+            mad += abs(value - mean)
+            flat = flat and value == last
+        mad /= cci_n
+        # a flat window is 0/0 in ta; don't let moving-sum rounding turn it into a value
+        dev = 0.0 if flat else last - mean
+        if mad != 0 and not flat:
+            cci = dev / (0.015 * mad)
+        elif dev == 0:
+            cci = nan
+        else:
+            cci = math.copysign(math.inf, dev)
+
+    return cci, obv_trend, rsi
+
+
+def _col(data: pd.DataFrame, name: str) -> np.ndarray:
+    # float64 columns come back as views of the frame's own buffer, no copy;
+    # a (field, ticker) MultiIndex from yf.download gives an (n, 1) block, flattened here
+    values = data[name].to_numpy(dtype=np.float64)
+    if values.ndim == 2:
+        values = values.reshape(-1)
+    return np.ascontiguousarray(values)
+
+
+def warm_up() -> None:
+    # compile (or load the cached build of) the kernel before the first request needs it
+    bars = np.linspace(100.0, 130.0, 32)
+    _indicator_kernel(bars + 1.0, bars - 1.0, bars, np.ones(32), 20, 14, 7)
+    _score_core(0.0, 50.0, 0.0, COMBO.w_cci, COMBO.w_rsi, COMBO.w_obv)
 
-    rsi_indicator = ta.momentum.RSIIndicator(close=close, window=14)
-    rsi = float(rsi_indicator.rsi().iloc[-1])
 
-    return {"CCI": cci, "OBV_trend": obv_trend, "RSI": rsi}
+def calculate_indicators(data: pd.DataFrame) -> Dict[str, float]:
+    cci, obv_trend, rsi = _indicator_kernel(
+        _col(data, "High"), _col(data, "Low"), _col(data, "Close"), _col(data, "Volume"), 20, 14, 7
+    )
+    return {"CCI": float(cci), "OBV_trend": float(obv_trend), "RSI": float(rsi)}
 
 
+@njit(cache=True)
 def _clip01(x: float) -> float:
     if x < 0:
         return 0.0
@@ -49,26 +150,40 @@ def _clip01(x: float) -> float:
     return x
 
 
-def _bullish_components(cci: float, rsi: float, obv_trend: float) -> Dict[str, float]:
+# components are plain (CCI, RSI, OBV) float tuples; only the chosen side becomes a dict
+@njit(cache=True)
+def _bullish_components(cci: float, rsi: float, obv_trend: float) -> Tuple[float, float, float]:
     cci_bull = _clip01((0.0 - cci) / 200.0) * 100.0
     rsi_bull = _clip01((50.0 - rsi) / 20.0) * 100.0
     obv_bull = 100.0 if obv_trend > 0 else 0.0
-    return {"CCI": cci_bull, "RSI": rsi_bull, "OBV": obv_bull}
+    return cci_bull, rsi_bull, obv_bull
 
 
-def _bearish_components(cci: float, rsi: float, obv_trend: float) -> Dict[str, float]:
+@njit(cache=True)
+def _bearish_components(cci: float, rsi: float, obv_trend: float) -> Tuple[float, float, float]:
     cci_bear = _clip01(cci / 200.0) * 100.0
     rsi_bear = _clip01((rsi - 50.0) / 20.0) * 100.0
     obv_bear = 100.0 if obv_trend < 0 else 0.0
-    return {"CCI": cci_bear, "RSI": rsi_bear, "OBV": obv_bear}
+    return cci_bear, rsi_bear, obv_bear
 
 
-def _weighted_sum(components: Dict[str, float], combo: OptimalCombo) -> float:
-    return (
-        components["CCI"] * combo.w_cci
-        + components["RSI"] * combo.w_rsi
-        + components["OBV"] * combo.w_obv
-    )
+@njit(cache=True)
+def _weighted_sum(components: Tuple[float, float, float], w_cci: float, w_rsi: float, w_obv: float) -> float:
+    cci_part, rsi_part, obv_part = components
+    return cci_part * w_cci + rsi_part * w_rsi + obv_part * w_obv
+
+
+@njit(cache=True)
+def _score_core(cci, rsi, obv_trend, w_cci, w_rsi, w_obv):
+    # both sides' components and weighted scores in one compiled call
+    bull = _bullish_components(cci, rsi, obv_trend)
+    bear = _bearish_components(cci, rsi, obv_trend)
+    return bull, bear, _weighted_sum(bull, w_cci, w_rsi, w_obv), _weighted_sum(bear, w_cci, w_rsi, w_obv)
+
+
+def _rounded_components(components: Tuple[float, float, float]) -> Dict[str, int]:
+    cci_part, rsi_part, obv_part = components
+    return {"CCI": round(cci_part), "RSI": round(rsi_part), "OBV": round(obv_part)}
 
 
 def _percent_from_threshold(score: float, min_thr: float, max_thr: float) -> int:
@@ -79,83 +194,173 @@ def _percent_from_threshold(score: float, min_thr: float, max_thr: float) -> int
     return int(1 + (score - min_thr) * 99.0 / (max_thr - min_thr))
 
 
-def _level_from_percent(p: int) -> str:
-    if p == 0:
-        return "미달"
-    if p >= 71:
-        return "매우강함"
-    if p >= 41:
-        return "강함"
-    return "적정"
-
-
-def _color_from_percent(p: int) -> str:
-    if p == 0:
-        return "#F44336"
-    if p >= 71:
-        return "#2E7D32"
-    if p >= 41:
-        return "#FBC02D"
-    return "#FB8C00"
-
-
-def auto_generate_signal(indicators: Dict[str, float]) -> Dict[str, object]:
-    combo = OptimalCombo()
-
-    cci = float(indicators.get("CCI", 0.0))
-    obv_trend = float(indicators.get("OBV_trend", 0.0))
-    rsi = float(indicators.get("RSI", 0.0))
-
-    bull = _bullish_components(cci, rsi, obv_trend)
-    bear = _bearish_components(cci, rsi, obv_trend)
-
-    buy_score = _weighted_sum(bull, combo)
-    sell_score = _weighted_sum(bear, combo)
+class Side(IntEnum):
+    NEUTRAL = 0
+    BUY = 1
+    SELL = 2
+
+
+# strength bands: 0 = below threshold, [1, 41) moderate, [41, 71) strong, 71+ very strong
+class Band(IntEnum):
+    NONE = 0
+    MODERATE = 1
+    STRONG = 2
+    VERY_STRONG = 3
+
+
+# display strings, indexed by Side / Band; only to_dict() touches them
+_SIDE_RECOMMENDATION_TEXT = ("관망", "매수", "매도")
+_SIDE_TEXT = ("중립", "매수", "매도")
+_BAND_BOUNDS = (1, 41, 71)
+_BAND_LEVELS = ("미달", "적정", "강함", "매우강함")
+_BAND_COLORS = (COLOR_NONE, COLOR_MODERATE, COLOR_STRONG, COLOR_VERY_STRONG)
+
+
+_BANDS = tuple(Band)
+
+
+def _band_from_percent(p: int) -> Band:
+    return _BANDS[bisect_right(_BAND_BOUNDS, p)]
+
+
+# COMBO is frozen, so the echoed thresholds/weights are built once and shared read-only
+_THRESHOLDS = {
+    "buy_min": COMBO.buy_min,
+    "sell_min": COMBO.sell_min,
+    "max": COMBO.max_threshold,
+    "min_action_strength": COMBO.min_action_strength,
+}
+_WEIGHTS = {"CCI": COMBO.w_cci, "RSI": COMBO.w_rsi, "OBV": COMBO.w_obv}
+
+
+@dataclass(slots=True)
+class Signal:
+    side: Side
+    band: Band
+    strength_pct: int
+    score: float
+    buy_score: float
+    sell_score: float
+    components: Tuple[float, float, float]
+    cci: float
+    rsi: float
+    obv_trend: float
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "recommendation": _SIDE_RECOMMENDATION_TEXT[self.side],
+            "decision_side": _SIDE_TEXT[self.side],
+            "score": int(round(self.score)),
+            "buy_score": round(self.buy_score, 2),
+            "sell_score": round(self.sell_score, 2),
+            "strength_pct": self.strength_pct,
+            "strength": f"{self.strength_pct}%",
+            "color": _BAND_COLORS[self.band],
+            "level": _BAND_LEVELS[self.band],
+            "reason": f"CCI={self.cci:.2f}, RSI={self.rsi:.2f}, OBV_trend={self.obv_trend:.2f}",
+            "components": _rounded_components(self.components),
+            "thresholds": _THRESHOLDS,
+            "weights": _WEIGHTS,
+        }
+
+
+def score_signal(cci: float, rsi: float, obv_trend: float) -> Signal:
+    # numbers only; strings are rendered by Signal.to_dict() when a response needs them
+    combo = COMBO
+    bull, bear, buy_score, sell_score = _score_core(cci, rsi, obv_trend, combo.w_cci, combo.w_rsi, combo.w_obv)
 
     buy_strength = _percent_from_threshold(buy_score, combo.buy_min, combo.max_threshold)
     sell_strength = _percent_from_threshold(sell_score, combo.sell_min, combo.max_threshold)
 
     if buy_strength == 0 and sell_strength == 0:
-        recommendation = "관망"
+        side = Side.NEUTRAL
         chosen_score = max(buy_score, sell_score)
         strength_pct = 0
-        side = "중립"
         chosen_components = bull if buy_score >= sell_score else bear
     elif buy_strength >= sell_strength:
-        recommendation = "매수"
+        side = Side.BUY
         chosen_score = buy_score
         strength_pct = buy_strength
-        side = "매수"
         chosen_components = bull
     else:
-        recommendation = "매도"
+        side = Side.SELL
         chosen_score = sell_score
         strength_pct = sell_strength
-        side = "매도"
         chosen_components = bear
 
     # strong signal filter
-    if recommendation in ("매수", "매도") and strength_pct < combo.min_action_strength:
-        recommendation = "관망"
-        side = "중립"
+    if side != Side.NEUTRAL and strength_pct < combo.min_action_strength:
+        side = Side.NEUTRAL
+
+    return Signal(
+        side,
+        _band_from_percent(strength_pct),
+        int(strength_pct),
+        chosen_score,
+        buy_score,
+        sell_score,
+        chosen_components,
+        cci,
+        rsi,
+        obv_trend,
+    )
+
+
+def auto_generate_signal(indicators: Dict[str, float]) -> Dict[str, object]:
+    return score_signal(
+        float(indicators.get("CCI", 0.0)),
+        float(indicators.get("RSI", 0.0)),
+        float(indicators.get("OBV_trend", 0.0)),
+    ).to_dict()
+
+
+_SIDE_RECOMMENDATIONS = np.array(_SIDE_RECOMMENDATION_TEXT, dtype=object)
+_SIDE_LABELS = np.array(_SIDE_TEXT, dtype=object)
+
+
+def _percent_from_threshold_array(score: np.ndarray, min_thr: float, max_thr: float) -> np.ndarray:
+    scaled = np.floor(1.0 + (score - min_thr) * 99.0 / (max_thr - min_thr))
+    pct = np.where(score >= max_thr, 100.0, np.where(score >= min_thr, scaled, 0.0))
+    return pct.astype(np.int64)
+
+
+def auto_generate_signals(cci, rsi, obv_trend) -> Dict[str, np.ndarray]:
+    # auto_generate_signal over whole series at once (e.g. one row per bar in a backtest):
+    # same arithmetic as the scalar path, scores left unrounded, NaN rows come out as 0% / 관망
+    combo = COMBO
+    cci = np.asarray(cci, dtype=np.float64)
+    rsi = np.asarray(rsi, dtype=np.float64)
+    obv_trend = np.asarray(obv_trend, dtype=np.float64)
+
+    buy_score = (
+        np.clip((0.0 - cci) / 200.0, 0.0, 1.0) * 100.0 * combo.w_cci
+        + np.clip((50.0 - rsi) / 20.0, 0.0, 1.0) * 100.0 * combo.w_rsi
+        + np.where(obv_trend > 0, 100.0, 0.0) * combo.w_obv
+    )
+    sell_score = (
+        np.clip(cci / 200.0, 0.0, 1.0) * 100.0 * combo.w_cci
+        + np.clip((rsi - 50.0) / 20.0, 0.0, 1.0) * 100.0 * combo.w_rsi
+        + np.where(obv_trend < 0, 100.0, 0.0) * combo.w_obv
+    )
+
+    buy_strength = _percent_from_threshold_array(buy_score, combo.buy_min, combo.max_threshold)
+    sell_strength = _percent_from_threshold_array(sell_score, combo.sell_min, combo.max_threshold)
+
+    # 0 = neutral, 1 = buy, 2 = sell; ties go to buy as in the scalar path
+    buy_wins = buy_strength >= sell_strength
+    active = (buy_strength > 0) | (sell_strength > 0)
+    strength_pct = np.where(active, np.where(buy_wins, buy_strength, sell_strength), 0)
+    side = np.where(active, np.where(buy_wins, 1, 2), 0)
+    # strong signal filter
+    side[strength_pct < combo.min_action_strength] = 0
 
+    band = np.searchsorted(_BAND_BOUNDS, strength_pct, side="right")
     return {
-        "recommendation": recommendation,
-        "decision_side": side,
-        "score": int(round(chosen_score)),
-        "buy_score": round(buy_score, 2),
-        "sell_score": round(sell_score, 2),
-        "strength_pct": int(strength_pct),
-        "strength": f"{int(strength_pct)}%",
-        "color": _color_from_percent(strength_pct),
-        "level": _level_from_percent(strength_pct),
-        "reason": f"CCI={cci:.2f}, RSI={rsi:.2f}, OBV_trend={obv_trend:.2f}",
-        "components": {k: int(round(v)) for k, v in chosen_components.items()},
-        "thresholds": {
-            "buy_min": combo.buy_min,
-            "sell_min": combo.sell_min,
-            "max": combo.max_threshold,
-            "min_action_strength": combo.min_action_strength,
-        },
-        "weights": {"CCI": combo.w_cci, "RSI": combo.w_rsi, "OBV": combo.w_obv},
+        "recommendation": _SIDE_RECOMMENDATIONS[side],
+        "decision_side": _SIDE_LABELS[side],
+        "buy_score": buy_score,
+        "sell_score": sell_score,
+        "strength_pct": strength_pct,
+        "color": np.asarray(_BAND_COLORS, dtype=object)[band],
+        "level": np.asarray(_BAND_LEVELS, dtype=object)[band],
     }
@@ -1,9 +1,15 @@
 import math
+from bisect import bisect_right
 from typing import Any
 
 import numpy as np
 import pandas as pd
 
+try:
+    import talib
+except ImportError:  # TA-Lib C 확장이 없으면 pandas rolling 으로 계산
+    talib = None
+
 # =========================
 # Trading Logic 2.3
 # =========================
@@ -23,6 +29,9 @@ SELL_THRESHOLD = 65
 
 SCORE_MAX = RSI_WEIGHT + OBV_WEIGHT + CCI_WEIGHT + POSITION_WEIGHT  # 100
 
+# 마지막 값이 참조하는 최대 구간: CCI 평균편차(20+20-1) + CCI_DELTA3(3) = 42봉, 여유를 두고 60
+INDICATOR_TAIL = 60
+
 BUY_HIGH_DISCOUNT = -5.0      # 최근 20일 고점 대비 -5% 이하
 SELL_HIGH_NEAR = -1.0         # 최근 20일 고점 대비 -1% 이내
 RSI_DELTA_BUY_MIN = 2.0       # RSI 3일 변화율
@@ -31,11 +40,15 @@ OBV_GAP_MIN = 0.5             # OBV와 OBV MA20 간 갭(%)
 VIX_BUY_PENALTY = 10
 VIX_SELL_BONUS = 5
 
+COLOR_BUY = "#2196F3"
+COLOR_SELL = "#F44336"
+COLOR_NEUTRAL = "#9E9E9E"
 
-def _safe_last(series: pd.Series) -> float:
+
+def _safe_last(series: pd.Series | np.ndarray) -> float:
     if series is None or len(series) == 0:
         return float("nan")
-    value = series.iloc[-1]
+    value = series.iloc[-1] if isinstance(series, pd.Series) else series[-1]
     if pd.isna(value):
         return float("nan")
     return float(value)
@@ -59,16 +72,13 @@ def _to_bool_label(flag: bool) -> str:
     return "True" if flag else "False"
 
 
-def _build_position_size(strength: float) -> int:
-    if strength <= 0:
-        return 0
-    if strength < 20:
-        return 30
-    if strength < 50:
-        return 50
-    if strength < 80:
-        return 70
-    return 100
+# 강도(0~100 정수) 구간별 비중: 0 / 1~19 / 20~49 / 50~79 / 80 이상
+POSITION_BOUNDS = (1, 20, 50, 80)
+POSITION_SIZES = (0, 30, 50, 70, 100)
+
+
+def _build_position_size(strength: int) -> int:
+    return POSITION_SIZES[bisect_right(POSITION_BOUNDS, strength)]
 
 
 def _score_to_strength(score: int, threshold: int, max_score: int = SCORE_MAX) -> int:
@@ -85,38 +95,109 @@ def _gap_percent(value: float, base: float) -> float:
     return ((_clean_float(value) / _clean_float(base)) - 1.0) * 100.0
 
 
+def _talib_ready(values: np.ndarray) -> bool:
+    # TA-Lib은 선행 NaN만 건너뛰므로, 중간 NaN이 있으면 pandas 경로를 사용한다.
+    if talib is None:
+        return False
+    valid = ~np.isnan(values)
+    return bool(valid.any()) and bool(valid[valid.argmax():].all())
+
+
+def _sma(series: pd.Series, window: int) -> pd.Series:
+    values = series.to_numpy(dtype=np.float64)
+    if _talib_ready(values):
+        return pd.Series(talib.SMA(values, timeperiod=window), index=series.index)
+    return series.rolling(window).mean()
+
+
+def _rolling_max(series: pd.Series, window: int) -> pd.Series:
+    values = series.to_numpy(dtype=np.float64)
+    if _talib_ready(values):
+        return pd.Series(talib.MAX(values, timeperiod=window), index=series.index)
+    return series.rolling(window).max()
+
+
+def _rolling_min(series: pd.Series, window: int) -> pd.Series:
+    values = series.to_numpy(dtype=np.float64)
+    if _talib_ready(values):
+        return pd.Series(talib.MIN(values, timeperiod=window), index=series.index)
+    return series.rolling(window).min()
+
+
+def _true_range(high: pd.Series, low: pd.Series, close: pd.Series) -> pd.Series:
+    high_values = high.to_numpy(dtype=np.float64)
+    low_values = low.to_numpy(dtype=np.float64)
+    close_values = close.to_numpy(dtype=np.float64)
+    # TRANGE 는 NaN 을 전파하므로 결측이 없을 때만 C 경로 사용
+    if talib is not None and len(close_values) and not np.isnan(high_values + low_values + close_values).any():
+        tr = talib.TRANGE(high_values, low_values, close_values)
+        # 첫 봉은 전일 종가가 없으므로 pandas 경로처럼 고가-저가
+        tr[0] = high_values[0] - low_values[0]
+        return pd.Series(tr, index=high.index)
+
+    tr1 = high - low
+    tr2 = (high - close.shift(1)).abs()
+    tr3 = (low - close.shift(1)).abs()
+    return pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+
+
+def _numeric_column(data: pd.DataFrame, col: str) -> pd.Series:
+    # 수집 단계에서 이미 숫자형으로 정리된 컬럼은 to_numeric 복사 없이 그대로 사용
+    series = data[col]
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return series
+    return pd.to_numeric(series, errors="coerce")
+
+
 def calculate_indicators(data: pd.DataFrame) -> dict:
     required_cols = ["Close", "High", "Low", "Volume"]
     missing = [col for col in required_cols if col not in data.columns]
     if missing:
         raise ValueError(f"필수 컬럼이 없습니다: {missing}")
 
-    df = data.copy()
-
-    close = pd.to_numeric(df["Close"], errors="coerce")
-    high = pd.to_numeric(df["High"], errors="coerce")
-    low = pd.to_numeric(df["Low"], errors="coerce")
-    volume = pd.to_numeric(df["Volume"], errors="coerce")
+    close = _numeric_column(data, "Close")
+    high = _numeric_column(data, "High")
+    low = _numeric_column(data, "Low")
+    volume = _numeric_column(data, "Volume")
+
+    # OBV: Series 연산 체인 대신 배열 연산 (누적합/7일 차이/MA20 갭)
+    # 첫 봉은 자기 자신을 앞에 붙여 차이 0 -> 부호 0 이 되므로 별도 0 배열/슬라이스 대입이 필요 없다
+    close_values = close.to_numpy(dtype=np.float64)
+    volume_values = volume.to_numpy(dtype=np.float64)
+    obv_step = np.sign(np.diff(close_values, prepend=close_values[:1])) * volume_values
+    obv_step[np.isnan(obv_step)] = 0.0
+    obv = obv_step.cumsum()
+
+    # OBV 누적치만 전체 이력이 필요하고, 나머지 지표는 최근 INDICATOR_TAIL 봉 창만 참조하므로 꼬리 구간만 계산
+    if len(close) > INDICATOR_TAIL:
+        data = data.iloc[-INDICATOR_TAIL:]
+        close, high, low = close.iloc[-INDICATOR_TAIL:], high.iloc[-INDICATOR_TAIL:], low.iloc[-INDICATOR_TAIL:]
+        obv = obv[-INDICATOR_TAIL:]
+
+    obv_ma20 = _sma(pd.Series(obv), 20).to_numpy()
+    obv_trend = np.full(len(obv), np.nan)
+    obv_trend[7:] = obv[7:] - obv[:-7]
+    obv_gap = ((obv / np.where(obv_ma20 == 0, np.nan, obv_ma20)) - 1) * 100
+    # OBV_WR: 최근 7봉 OBV 변화 / 같은 구간 거래량 합 (-1~1), 거래량 규모와 무관한 수급 방향
+    obv_wr = float("nan")
+    if len(volume_values) > 7:
+        recent_volume = np.nansum(volume_values[-7:])
+        if recent_volume > 0:
+            obv_wr = float(obv_trend[-1] / recent_volume)
 
     # RSI
     delta = close.diff()
     gain = delta.clip(lower=0)
     loss = -delta.clip(upper=0)
-    avg_gain = gain.rolling(14).mean()
-    avg_loss = loss.rolling(14).mean()
+    avg_gain = _sma(gain, 14)
+    avg_loss = _sma(loss, 14)
     rs = avg_gain / avg_loss.replace(0, np.nan)
     rsi = 100 - (100 / (1 + rs))
 
-    # OBV
-    obv = (np.sign(close.diff()) * volume).fillna(0).cumsum()
-    obv_ma20 = obv.rolling(20).mean()
-    obv_trend = obv.diff(7)
-    obv_gap = ((obv / obv_ma20.replace(0, np.nan)) - 1) * 100
-
     # CCI
     typical_price = (high + low + close) / 3
-    tp_ma20 = typical_price.rolling(20).mean()
-    mean_dev = (typical_price - tp_ma20).abs().rolling(20).mean()
+    tp_ma20 = _sma(typical_price, 20)
+    mean_dev = _sma((typical_price - tp_ma20).abs(), 20)
     cci = (typical_price - tp_ma20) / (0.015 * mean_dev.replace(0, np.nan))
     cci_delta3 = cci.diff(3)
 
@@ -126,43 +207,39 @@ def calculate_indicators(data: pd.DataFrame) -> dict:
 
     plus_dm = pd.Series(
         np.where((up_move > down_move) & (up_move > 0), up_move, 0.0),
-        index=df.index,
+        index=data.index,
     )
     minus_dm = pd.Series(
         np.where((down_move > up_move) & (down_move > 0), down_move, 0.0),
-        index=df.index,
+        index=data.index,
     )
 
-    tr1 = high - low
-    tr2 = (high - close.shift(1)).abs()
-    tr3 = (low - close.shift(1)).abs()
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-
-    atr = tr.rolling(14).mean()
-    plus_di = 100 * (plus_dm.rolling(14).mean() / atr.replace(0, np.nan))
-    minus_di = 100 * (minus_dm.rolling(14).mean() / atr.replace(0, np.nan))
+    tr = _true_range(high, low, close)
+    atr = _sma(tr, 14)
+    plus_di = 100 * (_sma(plus_dm, 14) / atr.replace(0, np.nan))
+    minus_di = 100 * (_sma(minus_dm, 14) / atr.replace(0, np.nan))
     dx = ((plus_di - minus_di).abs() / (plus_di + minus_di).replace(0, np.nan)) * 100
-    adx = dx.rolling(14).mean()
+    adx = _sma(dx, 14)
     adx_delta3 = adx.diff(3)
 
     # 위치 필터
-    price_ma20 = close.rolling(20).mean()
+    price_ma20 = _sma(close, 20)
     dist20 = ((close / price_ma20.replace(0, np.nan)) - 1) * 100
-    high20 = high.rolling(20).max()
+    high20 = _rolling_max(high, 20)
     high20_dist = ((close / high20.replace(0, np.nan)) - 1) * 100
-    low20 = low.rolling(20).min()
+    low20 = _rolling_min(low, 20)
     low20_dist = ((close / low20.replace(0, np.nan)) - 1) * 100
 
     rsi_delta3 = rsi.diff(3)
     close_prev1 = close.shift(1)
-    ma5 = close.rolling(5).mean()
+    ma5 = _sma(close, 5)
 
-    if "VIX" in df.columns:
-        vix = pd.to_numeric(df["VIX"], errors="coerce")
-        vix_5ma = vix.rolling(5).mean()
+    if "VIX" in data.columns:
+        vix = _numeric_column(data, "VIX")
+        vix_5ma = _sma(vix, 5)
     else:
-        vix = pd.Series(np.nan, index=df.index)
-        vix_5ma = pd.Series(np.nan, index=df.index)
+        vix = pd.Series(np.nan, index=data.index)
+        vix_5ma = pd.Series(np.nan, index=data.index)
 
     return {
         "RSI": _safe_last(rsi),
@@ -171,6 +248,7 @@ def calculate_indicators(data: pd.DataFrame) -> dict:
         "OBV_MA20": _safe_last(obv_ma20),
         "OBV_trend": _safe_last(obv_trend),
         "OBV_GAP": _safe_last(obv_gap),
+        "OBV_WR": obv_wr,
         "CCI": _safe_last(cci),
         "CCI_DELTA3": _safe_last(cci_delta3),
         "PLUS_DI": _safe_last(plus_di),
@@ -191,55 +269,23 @@ def calculate_indicators(data: pd.DataFrame) -> dict:
     }
 
 
-def _build_reason_text(
-    *,
-    decision: str,
-    buy_rsi_ok: bool,
-    buy_obv_ok: bool,
-    buy_cci_ok: bool,
-    buy_position_ok: bool,
-    sell_rsi_ok: bool,
-    sell_obv_ok: bool,
-    sell_cci_ok: bool,
-    sell_position_ok: bool,
-    vix_risk: bool,
-    buy_score: int,
-    sell_score: int,
-) -> str:
-    reasons: list[str] = []
+# 판단 근거 라벨: (RSI, OBV, CCI, 위치, VIX 위험) 플래그 순서와 동일
+REASON_LABELS = {
+    "매수": ("RSI 전환", "OBV 수급 개선", "CCI 반등", "저위치 매수 허용", "VIX 위험으로 매수 감점"),
+    "매도": ("RSI 둔화", "OBV 수급 약화", "CCI 약화", "고위치 매도 허용", "VIX 위험으로 매도 가점"),
+}
+MATCHED_KEYS = ("RSI", "OBV", "CCI", "POSITION", "VIX_RISK")
 
-    if decision == "매수":
-        if buy_rsi_ok:
-            reasons.append("RSI 전환")
-        if buy_obv_ok:
-            reasons.append("OBV 수급 개선")
-        if buy_cci_ok:
-            reasons.append("CCI 반등")
-        if buy_position_ok:
-            reasons.append("저위치 매수 허용")
-        if vix_risk:
-            reasons.append("VIX 위험으로 매수 감점")
-    else:
-        if sell_rsi_ok:
-            reasons.append("RSI 둔화")
-        if sell_obv_ok:
-            reasons.append("OBV 수급 약화")
-        if sell_cci_ok:
-            reasons.append("CCI 약화")
-        if sell_position_ok:
-            reasons.append("고위치 매도 허용")
-        if vix_risk:
-            reasons.append("VIX 위험으로 매도 가점")
 
+def _build_reason_text(decision: str, flags: tuple, buy_score: int, sell_score: int) -> str:
+    reasons = [label for label, ok in zip(REASON_LABELS[decision], flags) if ok]
     reasons.append(f"매수점수 {buy_score}")
     reasons.append(f"매도점수 {sell_score}")
     return ", ".join(reasons) if reasons else "판단 근거 부족"
 
 
-def generate_signal(indicators: dict, decision: str) -> dict:
-    if decision not in ["매수", "매도"]:
-        raise ValueError("decision은 '매수' 또는 '매도'여야 합니다.")
-
+def _score_both_sides(indicators: dict) -> tuple | None:
+    # 매수/매도 점수와 판단 플래그를 한 번에 계산, 기본 지표가 부족하면 None
     rsi = indicators.get("RSI", np.nan)
     rsi_delta3 = indicators.get("RSI_DELTA3", np.nan)
     obv = indicators.get("OBV", np.nan)
@@ -257,14 +303,7 @@ def generate_signal(indicators: dict, decision: str) -> dict:
 
     base_values = [rsi, rsi_delta3, obv, obv_ma20, obv_trend, cci, high20_dist, close]
     if any(pd.isna(v) for v in base_values):
-        return {
-            "recommendation": "관망",
-            "score": 0,
-            "strength": 0,
-            "position_size": 0,
-            "color": "#9E9E9E",
-            "reason": "지표 계산 데이터 부족",
-        }
+        return None
 
     rsi_f = _clean_float(rsi)
     rsi_delta_f = _clean_float(rsi_delta3)
@@ -326,75 +365,54 @@ def generate_signal(indicators: dict, decision: str) -> dict:
     buy_score = int(_clamp(buy_score, 0, SCORE_MAX))
     sell_score = int(_clamp(sell_score, 0, SCORE_MAX))
 
-    buy_strength = _score_to_strength(buy_score, BUY_THRESHOLD)
-    sell_strength = _score_to_strength(sell_score, SELL_THRESHOLD)
-    buy_position = _build_position_size(buy_strength)
-    sell_position = _build_position_size(sell_strength)
-
-    buy_result = {
-        "recommendation": "매수" if buy_score >= BUY_THRESHOLD else "관망",
-        "score": buy_score,
-        "strength": int(buy_strength),
-        "position_size": int(buy_position),
-        "color": "#2196F3" if buy_score >= BUY_THRESHOLD else "#9E9E9E",
-        "reason": _build_reason_text(
-            decision="매수",
-            buy_rsi_ok=buy_rsi_ok,
-            buy_obv_ok=buy_obv_ok,
-            buy_cci_ok=buy_cci_ok,
-            buy_position_ok=buy_position_ok,
-            sell_rsi_ok=sell_rsi_ok,
-            sell_obv_ok=sell_obv_ok,
-            sell_cci_ok=sell_cci_ok,
-            sell_position_ok=sell_position_ok,
-            vix_risk=vix_risk,
-            buy_score=buy_score,
-            sell_score=sell_score,
-        ),
-        "matched": {
-            "RSI": _to_bool_label(buy_rsi_ok),
-            "OBV": _to_bool_label(buy_obv_ok),
-            "CCI": _to_bool_label(buy_cci_ok),
-            "POSITION": _to_bool_label(buy_position_ok),
-            "VIX_RISK": _to_bool_label(vix_risk),
-        },
-    }
+    buy_flags = (buy_rsi_ok, buy_obv_ok, buy_cci_ok, buy_position_ok, vix_risk)
+    sell_flags = (sell_rsi_ok, sell_obv_ok, sell_cci_ok, sell_position_ok, vix_risk)
+    return buy_score, sell_score, buy_flags, sell_flags
+
+
+def _side_signal(decision: str, scored: tuple | None) -> dict:
+    if scored is None:
+        return {
+            "recommendation": "관망",
+            "score": 0,
+            "strength": 0,
+            "position_size": 0,
+            "color": COLOR_NEUTRAL,
+            "reason": "지표 계산 데이터 부족",
+        }
 
-    sell_result = {
-        "recommendation": "매도" if sell_score >= SELL_THRESHOLD else "관망",
-        "score": sell_score,
-        "strength": int(sell_strength),
-        "position_size": int(sell_position),
-        "color": "#F44336" if sell_score >= SELL_THRESHOLD else "#9E9E9E",
-        "reason": _build_reason_text(
-            decision="매도",
-            buy_rsi_ok=buy_rsi_ok,
-            buy_obv_ok=buy_obv_ok,
-            buy_cci_ok=buy_cci_ok,
-            buy_position_ok=buy_position_ok,
-            sell_rsi_ok=sell_rsi_ok,
-            sell_obv_ok=sell_obv_ok,
-            sell_cci_ok=sell_cci_ok,
-            sell_position_ok=sell_position_ok,
-            vix_risk=vix_risk,
-            buy_score=buy_score,
-            sell_score=sell_score,
-        ),
-        "matched": {
-            "RSI": _to_bool_label(sell_rsi_ok),
-            "OBV": _to_bool_label(sell_obv_ok),
-            "CCI": _to_bool_label(sell_cci_ok),
-            "POSITION": _to_bool_label(sell_position_ok),
-            "VIX_RISK": _to_bool_label(vix_risk),
-        },
+    buy_score, sell_score, buy_flags, sell_flags = scored
+    # 요청된 방향의 결과만 만든다
+    if decision == "매수":
+        score, threshold, color, flags = buy_score, BUY_THRESHOLD, COLOR_BUY, buy_flags
+    else:
+        score, threshold, color, flags = sell_score, SELL_THRESHOLD, COLOR_SELL, sell_flags
+
+    strength = _score_to_strength(score, threshold)
+    triggered = score >= threshold
+
+    return {
+        "recommendation": decision if triggered else "관망",
+        "score": score,
+        "strength": int(strength),
+        "position_size": int(_build_position_size(strength)),
+        "color": color if triggered else COLOR_NEUTRAL,
+        "reason": _build_reason_text(decision, flags, buy_score, sell_score),
+        "matched": dict(zip(MATCHED_KEYS, map(_to_bool_label, flags))),
     }
 
-    return buy_result if decision == "매수" else sell_result
+
+def generate_signal(indicators: dict, decision: str) -> dict:
+    if decision not in ["매수", "매도"]:
+        raise ValueError("decision은 '매수' 또는 '매도'여야 합니다.")
+    return _side_signal(decision, _score_both_sides(indicators))
 
 
 def generate_dual_signal(indicators: dict) -> dict:
-    buy_signal = generate_signal(indicators, "매수")
-    sell_signal = generate_signal(indicators, "매도")
+    # 점수 계산은 한 번만 하고 양쪽 결과를 만든다
+    scored = _score_both_sides(indicators)
+    buy_signal = _side_signal("매수", scored)
+    sell_signal = _side_signal("매도", scored)
 
     buy_ok = buy_signal["recommendation"] == "매수"
     sell_ok = sell_signal["recommendation"] == "매도"
@@ -419,16 +437,16 @@ def generate_dual_signal(indicators: dict) -> dict:
 
     final_position = 0
     final_reason = "매수/매도 임계값 미달"
-    final_color = "#9E9E9E"
+    final_color = COLOR_NEUTRAL
 
     if final_decision == "매수":
         final_position = int(buy_signal.get("position_size", 0))
         final_reason = str(buy_signal.get("reason", ""))
-        final_color = str(buy_signal.get("color", "#2196F3"))
+        final_color = str(buy_signal.get("color", COLOR_BUY))
     elif final_decision == "매도":
         final_position = int(sell_signal.get("position_size", 0))
         final_reason = str(sell_signal.get("reason", ""))
-        final_color = str(sell_signal.get("color", "#F44336"))
+        final_color = str(sell_signal.get("color", COLOR_SELL))
 
     return {
         "final_decision": final_decision,